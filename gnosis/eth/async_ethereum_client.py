@@ -0,0 +1,215 @@
+import asyncio
+from logging import getLogger
+from typing import Any, Dict, List, Optional, Union
+
+import aiohttp
+from hexbytes import HexBytes
+
+from .ethereum_client import (Erc20Info, Erc20Manager, EthereumClient,
+                              EthereumHash, ParityManager,
+                              ParityTraceDecodeException)
+from .utils import chunks
+
+logger = getLogger(__name__)
+
+
+class AsyncErc20Manager:
+    def __init__(self, ethereum_client: 'AsyncEthereumClient'):
+        self.ethereum_client = ethereum_client
+
+    async def get_balances(self, address: str, erc20_addresses: List[str]) -> List[Dict[str, Union[str, int]]]:
+        queries = Erc20Manager._build_balances_payload(address, erc20_addresses)
+        return Erc20Manager._parse_balances(erc20_addresses, await self.ethereum_client.raw_batch_request(queries))
+
+    async def get_info(self, erc20_address: str) -> Erc20Info:
+        """
+        Get erc20 information (`name`, `symbol` and `decimals`) using just one JSON-RPC batch
+        :param erc20_address:
+        :return: Erc20Info
+        :raises: InvalidERC20Info
+        """
+        queries = Erc20Manager._build_info_payload(erc20_address)
+        return Erc20Manager._parse_info(await self.ethereum_client.raw_batch_request(queries))
+
+
+class AsyncParityManager:
+    def __init__(self, ethereum_client: 'AsyncEthereumClient'):
+        self.ethereum_client = ethereum_client
+
+    async def trace_transaction(self, tx_hash: EthereumHash) -> List[Dict[str, Any]]:
+        params = [HexBytes(tx_hash).hex()]
+        try:
+            return ParityManager._decode_traces(await self.ethereum_client.request('trace_transaction', params,
+                                                                                   slow=True))
+        except ParityTraceDecodeException as exc:
+            logger.warning('Problem decoding trace: %s - Retrying', exc)
+            return ParityManager._decode_traces(await self.ethereum_client.request('trace_transaction', params,
+                                                                                   slow=True))
+
+    async def trace_transactions(self, tx_hashes: List[EthereumHash]) -> List[List[Dict[str, Any]]]:
+        if not tx_hashes:
+            return []
+        payload = ParityManager._build_trace_transactions_payload(tx_hashes)
+        return ParityManager._parse_trace_transactions(await self.ethereum_client.raw_batch_request(payload))
+
+    async def trace_filter(self, from_block: int = 1, to_block: Optional[int] = None,
+                           from_address: Optional[List[str]] = None, to_address: Optional[List[str]] = None,
+                           after: Optional[int] = None, count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Check `ParityManager.trace_filter`
+        """
+        parameters = ParityManager._build_trace_filter_parameters(from_block=from_block, to_block=to_block,
+                                                                  from_address=from_address, to_address=to_address,
+                                                                  after=after, count=count)
+        try:
+            return ParityManager._decode_traces(await self.ethereum_client.request('trace_filter', [parameters],
+                                                                                   slow=True))
+        except ParityTraceDecodeException as exc:
+            logger.warning('Problem decoding trace: %s - Retrying', exc)
+            return ParityManager._decode_traces(await self.ethereum_client.request('trace_filter', [parameters],
+                                                                                   slow=True))
+
+
+class AsyncEthereumClient:
+    """
+    Asyncio counterpart of `EthereumClient` for reading from the node. Every request shares one `aiohttp`
+    connection pool and the number of requests in flight is bounded, so a lot of coroutines can use the same client.
+    Results are formatted the same way than `EthereumClient` ones.
+    Must be closed after being used, `async with AsyncEthereumClient(...) as ethereum_client` can be used for that.
+    """
+    def __init__(self, ethereum_node_url: str = 'http://localhost:8545', slow_provider_timeout: int = 200,
+                 provider_timeout: int = 10, pool_size: int = 100, max_concurrent_requests: int = 100,
+                 batch_request_max_size: int = 500):
+        """
+        :param ethereum_node_url: Ethereum RPC uri
+        :param slow_provider_timeout: Timeout (seconds) for slow and batch queries (`eth_getLogs`, traces...)
+        :param provider_timeout: Timeout (seconds) for regular queries
+        :param pool_size: Maximum number of connections to the node kept alive in the pool
+        :param max_concurrent_requests: Maximum number of http requests in flight
+        :param batch_request_max_size: Maximum number of queries sent to the node on every JSON-RPC batch
+        """
+        self.ethereum_node_url = ethereum_node_url
+        self.slow_provider_timeout = slow_provider_timeout
+        self.provider_timeout = provider_timeout
+        self.pool_size = pool_size
+        self.max_concurrent_requests = max_concurrent_requests
+        self.batch_request_max_size = batch_request_max_size
+        self.erc20 = AsyncErc20Manager(self)
+        self.parity = AsyncParityManager(self)
+        # Session and semaphore must be created inside the event loop
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._request_id = 0
+
+    async def __aenter__(self) -> 'AsyncEthereumClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def http_session(self) -> aiohttp.ClientSession:
+        if not self._http_session:
+            self._http_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool_size))
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        return self._http_session
+
+    async def close(self):
+        if self._http_session:
+            await self._http_session.close()
+            self._http_session = None
+
+    async def _post(self, payload: Union[Dict[str, Any], List[Dict[str, Any]]], timeout: int) -> Any:
+        http_session = self.http_session
+        async with self._semaphore:
+            async with http_session.post(self.ethereum_node_url, json=payload,
+                                         timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+    async def request(self, method: str, params: List[Any], slow: bool = False) -> Any:
+        """
+        Send a JSON-RPC query to the node
+        :param method: JSON-RPC method
+        :param params: JSON-RPC params
+        :param slow: Use `slow_provider_timeout` instead of `provider_timeout`
+        :return: `result` of the response
+        :raises: ValueError: If node returns an error, like web3 does
+        """
+        self._request_id += 1
+        payload = {'jsonrpc': '2.0', 'method': method, 'params': params, 'id': self._request_id}
+        response = await self._post(payload, self.slow_provider_timeout if slow else self.provider_timeout)
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response['result']
+
+    async def raw_batch_request(self, payload: List[Dict[str, Any]],
+                                batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Split the JSON-RPC queries in batches of `batch_size` and send them concurrently to the node
+        :param payload: JSON-RPC queries
+        :param batch_size: Maximum number of queries per batch. If not provided, `batch_request_max_size`
+        :return: List with a response for every query, in the same order of the `payload`
+        :raises: ValueError: If node does not return a valid response for a batch
+        """
+        batch_size = batch_size or self.batch_request_max_size
+        payload = [dict(query, id=i) for i, query in enumerate(payload)]
+        batches_results = await asyncio.gather(*[self._post(batch, self.slow_provider_timeout)
+                                                 for batch in chunks(payload, batch_size)])
+        all_results = []
+        for batch, results in zip(chunks(payload, batch_size), batches_results):
+            # If the whole batch fails some nodes return a dictionary with `error` instead of a list
+            if not isinstance(results, list) or len(results) != len(batch):
+                raise ValueError('Unexpected response for batch request: %s' % results)
+            all_results.extend(sorted(results, key=lambda result: result.get('id') or 0))
+        return all_results
+
+    @property
+    async def current_block_number(self) -> int:
+        return int(await self.request('eth_blockNumber', []), 16)
+
+    async def estimate_gas(self, from_: str, to: str, value: int, data: bytes,
+                           block_identifier: Optional[str] = 'latest') -> int:
+        payload = EthereumClient._build_estimate_gas_payload(from_, to, value, data,
+                                                             block_identifier=block_identifier)
+        try:
+            return int(await self.request(payload['method'], payload['params']), 16)
+        except ValueError as exc:
+            # When using `pending`, Geth returns `too many arguments, want at most 1`
+            error = exc.args[0]
+            if block_identifier and isinstance(error, dict) and error.get('code') == -32602:
+                return int(await self.request(payload['method'], payload['params'][:1]), 16)
+            raise exc
+
+    async def get_transaction(self, tx_hash: EthereumHash) -> Optional[Dict[str, Any]]:
+        return EthereumClient._parse_transaction(await self.request('eth_getTransactionByHash',
+                                                                    [HexBytes(tx_hash).hex()]))
+
+    async def get_transactions(self, tx_hashes: List[EthereumHash]) -> List[Optional[Dict[str, Any]]]:
+        if not tx_hashes:
+            return []
+        payload = EthereumClient._build_transactions_payload(tx_hashes)
+        results = await self.raw_batch_request(payload)
+        return [EthereumClient._parse_transaction(result['result']) for result in results]
+
+    async def get_transaction_receipt(self, tx_hash: EthereumHash) -> Optional[Dict[str, Any]]:
+        return EthereumClient._parse_transaction_receipt(await self.request('eth_getTransactionReceipt',
+                                                                            [HexBytes(tx_hash).hex()]))
+
+    async def get_transaction_receipts(self, tx_hashes: List[EthereumHash]) -> List[Optional[Dict[str, Any]]]:
+        if not tx_hashes:
+            return []
+        payload = EthereumClient._build_transaction_receipts_payload(tx_hashes)
+        results = await self.raw_batch_request(payload)
+        return [EthereumClient._parse_transaction_receipt(result['result']) for result in results]
+
+    async def get_block(self, block_number: int, full_transactions=False) -> Optional[Dict[str, Any]]:
+        return EthereumClient._parse_block(await self.request('eth_getBlockByNumber',
+                                                              [hex(block_number), full_transactions]))
+
+    async def get_blocks(self, block_numbers: List[int], full_transactions=False) -> List[Optional[Dict[str, Any]]]:
+        if not block_numbers:
+            return []
+        payload = EthereumClient._build_blocks_payload(block_numbers, full_transactions=full_transactions)
+        results = await self.raw_batch_request(payload)
+        return [EthereumClient._parse_block(result['result']) for result in results]
@@ -0,0 +1,61 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Iterable
+
+
+class BaseCache(ABC):
+    """
+    Minimal key/value cache interface used to store immutable blockchain data (token metadata, bytecodes...)
+    """
+    @abstractmethod
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        :param keys:
+        :return: Dictionary with the `keys` found on the cache and their values
+        """
+        pass
+
+    @abstractmethod
+    def set_many(self, data: Dict[str, Any]) -> None:
+        pass
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.get_many([key]).get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        self.set_many({key: value})
+
+
+class LRUCache(BaseCache):
+    """
+    Thread safe in-process cache, least recently used elements are removed when `maxsize` is reached
+    """
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        result = {}
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    result[key] = self._data[key]
+        return result
+
+    def set_many(self, data: Dict[str, Any]) -> None:
+        with self._lock:
+            for key, value in data.items():
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
@@ -1,13 +1,25 @@
 import json
 import os
 import sys
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
 
+from eth_abi.encoding import TupleEncoder
+from eth_abi.registry import registry
 from hexbytes import HexBytes
 from web3 import Web3
+from web3.contract import Contract
 
+from ..cache import LRUCache
 
-def load_contract_interface(file_name):
+
+@lru_cache(maxsize=None)
+def load_contract_interface(file_name: str) -> Dict[str, Any]:
+    """
+    Contract interfaces are loaded on first use and then cached, as some of them are big (bytecode)
+    :param file_name: JSON artifact file name
+    :return: Contract interface, must not be modified
+    """
     return _load_json_file(_abi_file_path(file_name))
 
 
@@ -59,28 +71,104 @@ contracts = {
 }
 
 
-def generate_contract_fn(contract: Dict[str, Any]):
+# Contract factories and contract instances are stored on every `Web3` instance, as building them means processing
+# the ABI. They hold a reference to the `Web3` instance, so storing them there lets them be garbage collected with it
+_CONTRACT_FACTORIES_ATTRIBUTE = '_gnosis_contract_factories'
+_CONTRACT_INSTANCES_ATTRIBUTE = '_gnosis_contract_instances'
+
+
+def get_contract_factory(w3: Web3, contract_name: str) -> Type[Contract]:
+    """
+    :param w3:
+    :param contract_name: Key for the `contracts` dictionary
+    :return: Cached contract factory for `w3`
     """
-    Dynamically generate functions to work with the contracts
-    :param json_contract_filename:
+    contract_factories: Optional[Dict[str, Type[Contract]]] = getattr(w3, _CONTRACT_FACTORIES_ATTRIBUTE, None)
+    if contract_factories is None:
+        contract_factories = {}
+        setattr(w3, _CONTRACT_FACTORIES_ATTRIBUTE, contract_factories)
+    if contract_name not in contract_factories:
+        contract = load_contract_interface(contracts[contract_name])
+        contract_factories[contract_name] = w3.eth.contract(abi=contract['abi'], bytecode=contract.get('bytecode'))
+    return contract_factories[contract_name]
+
+
+def generate_contract_fn(contract_name: str):
+    """
+    Dynamically generate functions to work with the contracts. Contract interface is loaded on first use,
+    contract factory is built once for every `w3` and contract instances for the most recently used addresses
+    are cached
+    :param contract_name: Key for the `contracts` dictionary
     :return:
     """
     def fn(w3: Web3, address: Optional[str] = None):
-        return w3.eth.contract(address,
-                               abi=contract['abi'],
-                               bytecode=contract.get('bytecode'))
+        contract_factory = get_contract_factory(w3, contract_name)
+        if not address:
+            return contract_factory
+        contract_instances: Optional[LRUCache] = getattr(w3, _CONTRACT_INSTANCES_ATTRIBUTE, None)
+        if contract_instances is None:
+            contract_instances = LRUCache(maxsize=1024)
+            setattr(w3, _CONTRACT_INSTANCES_ATTRIBUTE, contract_instances)
+        key = f'{contract_name}:{address}'
+        contract_instance = contract_instances.get(key)
+        if contract_instance is None:
+            contract_instance = contract_factory(address=address)
+            contract_instances.set(key, contract_instance)
+        return contract_instance
     return fn
 
 
-for contract_name, json_contract_filename in contracts.items():
+for contract_name in contracts:
     fn_name = 'get_{}_contract'.format(contract_name)
-    contract_dict = load_contract_interface(json_contract_filename)
-    setattr(current_module, fn_name, generate_contract_fn(contract_dict))
+    setattr(current_module, fn_name, generate_contract_fn(contract_name))
+
+
+@lru_cache(maxsize=None)
+def _get_function_encoder(contract_name: str, function_name: str,
+                          arguments_length: int) -> Tuple[bytes, TupleEncoder, List[int]]:
+    """
+    :param contract_name: Key for the `contracts` dictionary
+    :param function_name:
+    :param arguments_length: Number of arguments, to choose between overloaded functions
+    :return: Tuple with 4 bytes selector, ABI encoder for the arguments and positions of the `bytes` arguments
+    """
+    for element in load_contract_interface(contracts[contract_name])['abi']:
+        if (element['type'] == 'function' and element['name'] == function_name
+                and len(element['inputs']) == arguments_length):
+            types = [function_input['type'] for function_input in element['inputs']]
+            selector = bytes(Web3.keccak(text='{}({})'.format(function_name, ','.join(types)))[:4])
+            encoder = TupleEncoder(encoders=[registry.get_encoder(type_) for type_ in types])
+            return selector, encoder, [i for i, type_ in enumerate(types) if type_ == 'bytes']
+    raise ValueError('Function %s with %d arguments not found for contract %s' % (function_name,
+                                                                                  arguments_length,
+                                                                                  contract_name))
+
+
+def encode_contract_function(contract_name: str, function_name: str, arguments: Sequence[Any]) -> HexBytes:
+    """
+    Encode the calldata for a contract function without using web3, so no provider is needed. Selector and
+    ABI encoder are built on first use and then cached
+    :param contract_name: Key for the `contracts` dictionary
+    :param function_name:
+    :param arguments: Arguments for the function. `bytes` arguments can be hex strings
+    :return: 4 bytes selector followed by the ABI encoded arguments
+    :raises: ValueError: If function is not found
+    :raises: eth_abi.exceptions.EncodingError: If arguments are not valid
+    """
+    selector, encoder, bytes_positions = _get_function_encoder(contract_name, function_name, len(arguments))
+    if bytes_positions:
+        arguments = list(arguments)
+        for i in bytes_positions:
+            if isinstance(arguments[i], str):
+                arguments[i] = HexBytes(arguments[i])
+    return HexBytes(selector + encoder(arguments))
 
 
+@lru_cache(maxsize=None)
 def get_paying_proxy_deployed_bytecode() -> bytes:
     return HexBytes(load_contract_interface('PayingProxy.json')['deployedBytecode'])
 
 
+@lru_cache(maxsize=None)
 def get_proxy_1_0_0_deployed_bytecode() -> bytes:
     return HexBytes(load_contract_interface('Proxy_V1_0_0.json')['deployedBytecode'])
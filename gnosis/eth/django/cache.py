@@ -0,0 +1,35 @@
+from typing import Any, Dict, Iterable, Optional
+
+from django.core.cache import caches
+
+from ..cache import BaseCache
+
+
+class DjangoCache(BaseCache):
+    """
+    `BaseCache` backed by one of the configured Django `CACHES`, so data can be shared between processes
+    """
+    def __init__(self, alias: str = 'default', key_prefix: str = 'gnosis-py', timeout: Optional[int] = None):
+        """
+        :param alias: Django cache alias
+        :param key_prefix: Prefix for every key, to prevent collisions with other data on the cache
+        :param timeout: Seconds until keys expire. `None` to never expire them
+        """
+        self.alias = alias
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _build_key(self, key: str) -> str:
+        return f'{self.key_prefix}:{key}'
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        prefixed_keys = {self._build_key(key): key for key in keys}
+        return {prefixed_keys[prefixed_key]: value
+                for prefixed_key, value in self.cache.get_many(list(prefixed_keys)).items()}
+
+    def set_many(self, data: Dict[str, Any]) -> None:
+        self.cache.set_many({self._build_key(key): value for key, value in data.items()}, timeout=self.timeout)
@@ -0,0 +1,17 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from ...ethereum_client import Erc20Info
+from ..cache import DjangoCache
+
+
+class TestDjangoCache(TestCase):
+    def test_django_cache(self):
+        django_cache = DjangoCache(key_prefix='test-gnosis-py')
+        erc20_info = Erc20Info('Gnosis', 'GNO', 18)
+        self.assertEqual(django_cache.get_many(['a', 'b']), {})
+        django_cache.set_many({'a': erc20_info, 'b': 2})
+        self.assertEqual(django_cache.get_many(['a', 'b', 'c']), {'a': erc20_info, 'b': 2})
+        self.assertEqual(django_cache.get('a'), erc20_info)
+        self.assertEqual(cache.get('test-gnosis-py:b'), 2)
+        cache.delete_many(['test-gnosis-py:a', 'test-gnosis-py:b'])
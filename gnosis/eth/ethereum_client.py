@@ -1,7 +1,10 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from functools import wraps
 from logging import getLogger
-from typing import Any, Dict, List, NamedTuple, Optional, Union
+from typing import (Any, Deque, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, Sequence, Union)
 
 import eth_abi
 import requests
@@ -11,17 +14,23 @@ from eth_account.signers.local import LocalAccount
 from ethereum.utils import (check_checksum, checksum_encode,
                             mk_contract_address, privtoaddr)
 from hexbytes import HexBytes
+from requests.adapters import HTTPAdapter
 from web3 import HTTPProvider, Web3
-from web3._utils.method_formatters import (block_formatter, receipt_formatter,
+from web3._utils.method_formatters import (block_formatter,
+                                           log_entry_formatter,
+                                           receipt_formatter,
                                            transaction_formatter)
+from web3.datastructures import AttributeDict
 from web3.exceptions import BlockNotFound, TimeExhausted, TransactionNotFound
 from web3.middleware import geth_poa_middleware
 from web3.providers import AutoProvider
+from web3.types import RPCEndpoint, RPCResponse
 
+from .cache import BaseCache, LRUCache
 from .constants import (ERC20_721_TRANSFER_TOPIC, GAS_CALL_DATA_BYTE,
                         GAS_CALL_DATA_ZERO_BYTE, NULL_ADDRESS)
 from .contracts import get_erc20_contract
-from .utils import decode_string_or_bytes32
+from .utils import chunks, decode_string_or_bytes32
 
 logger = getLogger(__name__)
 
@@ -95,6 +104,10 @@ class InvalidERC20Info(EthereumClientException):
     pass
 
 
+class BatchRequestException(EthereumClientException):
+    pass
+
+
 def tx_with_exception_handling(func):
     error_with_exception: Dict[str, Exception] = {
         'Transaction with the same hash was already imported': TransactionAlreadyImported,
@@ -136,6 +149,43 @@ class Erc20Info(NamedTuple):
     decimals: int
 
 
+class BalancesMatrix:
+    """
+    Balances for every owner and token. `balances[i][j]` is the balance of `owners[i]` for `tokens[j]`,
+    `None` if it could not be retrieved
+    """
+    def __init__(self, owners: List[str], tokens: List[str], balances: List[List[Optional[int]]]):
+        self.owners = owners
+        self.tokens = tokens
+        self.balances = balances
+        # First position of every address, like `list.index`
+        self._owner_indexes = {owner: i for i, owner in reversed(list(enumerate(owners)))}
+        self._token_indexes = {token: i for i, token in reversed(list(enumerate(tokens)))}
+
+    def get_balance(self, owner: str, token: str) -> Optional[int]:
+        """
+        :raises: KeyError: If `owner` or `token` are not on the matrix
+        """
+        return self.balances[self._owner_indexes[owner]][self._token_indexes[token]]
+
+
+class HTTPProviderWithSession(HTTPProvider):
+    """
+    `HTTPProvider` using the provided `requests.Session`, so connections to the node are pooled and kept alive
+    instead of using the `requests` sessions cached by web3
+    """
+    def __init__(self, endpoint_uri: str, session: requests.Session, request_kwargs: Optional[Dict[str, Any]] = None):
+        super().__init__(endpoint_uri, request_kwargs=request_kwargs)
+        self.session = session
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        self.logger.debug("Making request HTTP. URI: %s, Method: %s", self.endpoint_uri, method)
+        request_data = self.encode_rpc_request(method, params)
+        response = self.session.post(self.endpoint_uri, data=request_data, **self.get_request_kwargs())
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+
 class EthereumClientProvider:
     def __new__(cls):
         if not hasattr(cls, 'instance'):
@@ -148,11 +198,32 @@ class Erc20Manager:
     # keccak('Transfer(address,address,uint256)')
     # ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef
     TRANSFER_TOPIC = HexBytes(ERC20_721_TRANSFER_TOPIC)
+    BALANCE_OF_SELECTOR = '0x70a08231'  # keccak('balanceOf(address)')[:4]
+    NAME_SELECTOR = '0x06fdde03'  # keccak('name()')[:4]
+    SYMBOL_SELECTOR = '0x95d89b41'  # keccak('symbol()')[:4]
+    DECIMALS_SELECTOR = '0x313ce567'  # keccak('decimals()')[:4]
 
-    def __init__(self, ethereum_client: 'EthereumClient', slow_provider_timeout: int):
+    def __init__(self, ethereum_client: 'EthereumClient', slow_provider_timeout: int,
+                 info_cache: Optional[BaseCache] = None):
+        """
+        :param ethereum_client:
+        :param slow_provider_timeout:
+        :param info_cache: Cache for `Erc20Info`, as token metadata doesn't change. If not provided, an in-process
+        `LRUCache` will be used. Keys include the network id, so it can be shared between networks
+        """
         self.ethereum_client = ethereum_client
         self.w3 = ethereum_client.w3
         self.slow_w3 = Web3(self.ethereum_client.get_slow_provider(timeout=slow_provider_timeout))
+        self.info_cache = info_cache if info_cache is not None else LRUCache(maxsize=4096)
+        self._network_id: Optional[int] = None
+
+    def _build_info_cache_key(self, erc20_address: str) -> str:
+        """
+        :return: Key for `info_cache`, including the network id (requested to the node only once)
+        """
+        if self._network_id is None:
+            self._network_id = int(self.w3.net.version)
+        return f'erc20-info:{self._network_id}:{erc20_address.lower()}'
 
     def decode_logs(self, logs: List[Dict[str, Any]]):
         decoded_logs = []
@@ -200,7 +271,8 @@ class Erc20Manager:
         """
         return get_erc20_contract(self.w3, erc20_address).functions.balanceOf(address).call()
 
-    def get_balances(self, address: str, erc20_addresses: List[str]) -> List[Dict[str, Union[str, int]]]:
+    @staticmethod
+    def _build_balances_payload(address: str, erc20_addresses: List[str]) -> List[Dict[str, Any]]:
         # Build ether `eth_getBalance` query
         balance_query = {"jsonrpc": "2.0",
                          "method": "eth_getBalance",
@@ -216,46 +288,156 @@ class Erc20Manager:
                                         "data": "0x70a08231" + '{:0>64}'.format(address.replace('0x', '').lower())
                                         }, "latest"],
                             "id": i + 1})
-        response = requests.post(self.ethereum_client.ethereum_node_url, json=queries)
-        balances = []
-        for token_address, data in zip([None] + erc20_addresses, response.json()):
-            balances.append({
-                'token_address': token_address,
-                'balance': 0 if data['result'] == '0x' else int(data['result'], 16)
-            })
-        return balances
+        return queries
+
+    @staticmethod
+    def _parse_balance(result: Dict[str, Any]) -> Optional[int]:
+        """
+        :param result: JSON-RPC response for `eth_getBalance` or `balanceOf`
+        :return: Balance, `None` if the node returned an error
+        """
+        data = result.get('result')
+        if data is None:
+            return None
+        elif data == '0x':  # Not a contract
+            return 0
+        try:
+            return int(data[:66], 16)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _parse_balances(erc20_addresses: List[str],
+                        results: List[Dict[str, Any]]) -> List[Dict[str, Union[str, int]]]:
+        return [{'token_address': token_address,
+                 'balance': 0 if result['result'] == '0x' else int(result['result'], 16)}
+                for token_address, result in zip([None] + erc20_addresses, results)]
+
+    def get_balances(self, address: str, erc20_addresses: List[str]) -> List[Dict[str, Union[str, int]]]:
+        queries = self._build_balances_payload(address, erc20_addresses)
+        return self._parse_balances(erc20_addresses, self.ethereum_client.raw_batch_request(queries))
+
+    @classmethod
+    def _build_balances_matrix_payload(cls, owners: Sequence[str], tokens: Sequence[str],
+                                       block_identifier: str) -> List[Dict[str, Any]]:
+        queries = []
+        for owner in owners:
+            encoded_owner = '{:0>64}'.format(owner.replace('0x', '').lower())
+            for token in tokens:
+                if token == NULL_ADDRESS:
+                    query = {'jsonrpc': '2.0', 'method': 'eth_getBalance', 'params': [owner, block_identifier]}
+                else:
+                    query = {'jsonrpc': '2.0', 'method': 'eth_call',
+                             'params': [{'to': token, 'data': cls.BALANCE_OF_SELECTOR + encoded_owner},
+                                        block_identifier]}
+                queries.append(query)
+        return queries
+
+    def get_balances_matrix(self, owners: Sequence[str], tokens: Sequence[str],
+                            block_identifier: Union[int, str] = 'latest') -> BalancesMatrix:
+        """
+        Get the balances of every owner for every token. Queries are sent in JSON-RPC batches processed
+        concurrently, and entries the node cannot resolve don't make the other ones fail.
+        :param owners: Owner addresses
+        :param tokens: Erc20 token addresses. Use `NULL_ADDRESS` for ether
+        :param block_identifier: Block number or `latest`, `pending`...
+        :return: BalancesMatrix
+        :raises: BatchRequestException: If the node fails for a whole batch
+        """
+        owners, tokens = list(owners), list(tokens)
+        if isinstance(block_identifier, int):
+            block_identifier = hex(block_identifier)
+        balances: List[List[Optional[int]]] = []
+        if tokens:
+            # Build the payload by chunks of owners, so memory usage does not depend on the number of owners
+            ethereum_client = self.ethereum_client
+            owners_per_chunk = max(1, ethereum_client.batch_request_max_size
+                                   * ethereum_client.batch_request_max_workers * 2 // len(tokens))
+            for owners_chunk in chunks(owners, owners_per_chunk):
+                payload = self._build_balances_matrix_payload(owners_chunk, tokens, block_identifier)
+                results = [self._parse_balance(result)
+                           for result in ethereum_client.iter_raw_batch_request(payload)]
+                balances.extend(chunks(results, len(tokens)))
+        else:
+            balances = [[] for _ in owners]
+        return BalancesMatrix(owners, tokens, balances)
 
     def get_name(self, erc20_address: str) -> str:
-        erc20 = get_erc20_contract(self.w3, erc20_address)
-        data = erc20.functions.name().buildTransaction({'gas': 0, 'gasPrice': 0})['data']
-        result = self.w3.eth.call({'to': erc20_address, 'data': data})
+        result = self.w3.eth.call({'to': erc20_address, 'data': self.NAME_SELECTOR})
         return decode_string_or_bytes32(result)
 
     def get_symbol(self, erc20_address: str) -> str:
-        erc20 = get_erc20_contract(self.w3, erc20_address)
-        data = erc20.functions.symbol().buildTransaction({'gas': 0, 'gasPrice': 0})['data']
-        result = self.w3.eth.call({'to': erc20_address, 'data': data})
+        result = self.w3.eth.call({'to': erc20_address, 'data': self.SYMBOL_SELECTOR})
         return decode_string_or_bytes32(result)
 
     def get_decimals(self, erc20_address: str) -> int:
-        erc20 = get_erc20_contract(self.w3, erc20_address)
-        return erc20.functions.decimals().call()
+        result = self.w3.eth.call({'to': erc20_address, 'data': self.DECIMALS_SELECTOR})
+        return eth_abi.decode_single('uint8', result)
 
-    def get_info(self, erc20_address: str) -> Erc20Info:
+    @classmethod
+    def _build_info_payload(cls, erc20_address: str) -> List[Dict[str, Any]]:
+        return [{'jsonrpc': '2.0', 'method': 'eth_call', 'id': i,
+                 'params': [{'to': erc20_address, 'data': selector}, 'latest']}
+                for i, selector in enumerate((cls.NAME_SELECTOR, cls.SYMBOL_SELECTOR, cls.DECIMALS_SELECTOR))]
+
+    @staticmethod
+    def _parse_info(results: List[Dict[str, Any]]) -> Erc20Info:
         """
-        Get erc20 information (`name`, `symbol` and `decimals`)
-        :param erc20_address:
+        :param results: Responses for the `eth_call` queries built by `_build_info_payload`
         :return: Erc20Info
+        :raises: InvalidERC20Info
         """
-        # We use the `example erc20` as the `erc20 interface` doesn't have `name`, `symbol` nor `decimals`
         try:
-            name = self.get_name(erc20_address)
-            symbol = self.get_symbol(erc20_address)
-            decimals = self.get_decimals(erc20_address)
-            return Erc20Info(name, symbol, decimals)
-        except (InsufficientDataBytes, ValueError) as e:
+            name_data, symbol_data, decimals_data = [HexBytes(result['result']) for result in results]
+            return Erc20Info(decode_string_or_bytes32(name_data),
+                             decode_string_or_bytes32(symbol_data),
+                             eth_abi.decode_single('uint8', decimals_data))
+        except (InsufficientDataBytes, ValueError, KeyError) as e:
             raise InvalidERC20Info from e
 
+    def get_info(self, erc20_address: str) -> Erc20Info:
+        """
+        Get erc20 information (`name`, `symbol` and `decimals`). Check `get_infos`
+        :param erc20_address:
+        :return: Erc20Info
+        :raises: InvalidERC20Info
+        """
+        erc20_info = self.get_infos([erc20_address])[0]
+        if not erc20_info:
+            raise InvalidERC20Info(f'Cannot get erc20 info for {erc20_address}')
+        return erc20_info
+
+    def get_infos(self, erc20_addresses: Sequence[str]) -> List[Optional[Erc20Info]]:
+        """
+        Get erc20 information (`name`, `symbol` and `decimals`) for every token. Tokens not found on `info_cache`
+        are retrieved using JSON-RPC batches and stored on the cache
+        :param erc20_addresses:
+        :return: List with an `Erc20Info` for every `erc20_address`, in the same order. `None` if information
+        for a token cannot be retrieved (not a contract, not an erc20 token...)
+        """
+        if not erc20_addresses:
+            return []
+
+        cache_keys = [self._build_info_cache_key(erc20_address) for erc20_address in erc20_addresses]
+        erc20_infos = self.info_cache.get_many(list(dict.fromkeys(cache_keys)))
+        # Cache key -> address, for every token not cached (just once, even if addresses use different case)
+        not_cached_addresses = {cache_key: erc20_address
+                                for cache_key, erc20_address in zip(cache_keys, erc20_addresses)
+                                if cache_key not in erc20_infos}
+        if not_cached_addresses:
+            payload = [query for erc20_address in not_cached_addresses.values()
+                       for query in self._build_info_payload(erc20_address)]
+            results = self.ethereum_client.raw_batch_request(payload)
+            retrieved_infos = {}
+            for (cache_key, erc20_address), info_results in zip(not_cached_addresses.items(), chunks(results, 3)):
+                try:
+                    retrieved_infos[cache_key] = self._parse_info(info_results)
+                except InvalidERC20Info:
+                    logger.debug('Cannot get erc20 info for %s', erc20_address)
+            self.info_cache.set_many(retrieved_infos)
+            erc20_infos.update(retrieved_infos)
+        return [erc20_infos.get(cache_key) for cache_key in cache_keys]
+
     def get_total_transfer_history(self, addresses: List[str], from_block: int = 0,
                                    to_block: Optional[int] = None,
                                    token_address: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -330,6 +512,97 @@ class Erc20Manager:
         erc20_events.sort(key=lambda x: x['blockNumber'])
         return erc20_events
 
+    def _get_transfer_history_window(self, topics_list: List[List[Any]], from_block: int, to_block: int,
+                                     token_address: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        :return: Decoded erc20 and erc721 events for every `topics` in `topics_list` between `from_block` and
+        `to_block`, sorted by blockNumber
+        :raises: ValueError: If node returns an error (e.g. too many results)
+        """
+        parameters: Dict[str, Any] = {'fromBlock': hex(from_block), 'toBlock': hex(to_block)}
+        if token_address:
+            parameters['address'] = token_address
+        payload = [{'id': i, 'jsonrpc': '2.0', 'method': 'eth_getLogs', 'params': [dict(parameters, topics=topics)]}
+                   for i, topics in enumerate(topics_list)]
+
+        erc20_events = []
+        # Windows are already fetched using the `batch_request_executor`, so don't submit more tasks to it
+        for result in self.ethereum_client._send_batch_request(payload):
+            if 'error' in result:
+                raise ValueError(result['error'])
+            for raw_event in result['result']:
+                event = log_entry_formatter(raw_event)
+                event['args'] = self._decode_erc20_or_erc721_log(event['data'], event['topics'])
+                if event['args']:
+                    # Same type returned by web3 `getLogs`
+                    erc20_events.append(AttributeDict.recursive(event))
+        erc20_events.sort(key=lambda x: x['blockNumber'])
+        return erc20_events
+
+    def iter_total_transfer_history(self, addresses: List[str], from_block: int = 0,
+                                    to_block: Optional[int] = None, token_address: Optional[str] = None,
+                                    block_window: int = 5000, max_block_window: int = 100000,
+                                    sparse_events: int = 100, max_pending_windows: int = 4
+                                    ) -> Iterator[Dict[str, Any]]:
+        """
+        Same as `get_total_transfer_history`, but instead of querying the whole block range at once the range
+        is split in windows of blocks fetched concurrently (at most `max_pending_windows` ahead). Decoded events
+        are yielded in block order as soon as their window and every previous one are received.
+        Windows are halved if the node fails (e.g. `query returned more than 10000 results`) and doubled if
+        they return less than `sparse_events` events.
+        :param addresses: Search events `from` and `to` these `addresses`
+        :param from_block: Block to start querying from
+        :param to_block: Block to stop querying from. If not provided, current block
+        :param token_address: Address of the token
+        :param block_window: Initial number of blocks queried on every `eth_getLogs`
+        :param max_block_window: Maximum number of blocks queried on every `eth_getLogs`
+        :param sparse_events: If less events than this are found on a window, next windows will be doubled
+        :param max_pending_windows: Maximum number of windows fetched concurrently
+        :return: Iterator of events sorted by blockNumber
+        :raises: ValueError: If node fails for a window of just one block
+        """
+        topic_0 = self.TRANSFER_TOPIC.hex()
+        addresses_encoded = [HexBytes(eth_abi.encode_single('address', address)).hex() for address in addresses]
+        # Topics for transfer `to` and `from` an address
+        topics_list = [[topic_0, None, addresses_encoded], [topic_0, addresses_encoded]]
+        if to_block is None:
+            to_block = self.ethereum_client.current_block_number
+
+        executor = self.ethereum_client.batch_request_executor
+
+        def fetch_window(window_from_block: int, window_to_block: int):
+            return (window_from_block, window_to_block,
+                    executor.submit(self._get_transfer_history_window, topics_list,
+                                    window_from_block, window_to_block, token_address=token_address))
+
+        pending: Deque = deque()
+        next_block = from_block
+        while next_block <= to_block or pending:
+            while next_block <= to_block and len(pending) < max_pending_windows:
+                window_to_block = min(next_block + block_window - 1, to_block)
+                pending.append(fetch_window(next_block, window_to_block))
+                next_block = window_to_block + 1
+
+            window_from_block, window_to_block, future = pending.popleft()
+            window_size = window_to_block - window_from_block + 1
+            try:
+                events = future.result()
+            except (requests.RequestException, ValueError) as exc:
+                if window_size == 1:
+                    raise
+                logger.warning('Problem getting transfer history for blocks %d-%d: %s - Splitting window',
+                               window_from_block, window_to_block, exc)
+                # Split the failed window and query both halves before anything else
+                block_window = max(window_size // 2, 1)
+                middle_block = window_from_block + block_window - 1
+                pending.appendleft(fetch_window(middle_block + 1, window_to_block))
+                pending.appendleft(fetch_window(window_from_block, middle_block))
+                continue
+
+            if len(events) < sparse_events and window_size >= block_window:
+                block_window = min(block_window * 2, max_block_window)
+            yield from events
+
     def get_transfer_history(self, from_block: int, to_block: Optional[int] = None,
                              from_address: Optional[str] = None, to_address: Optional[str] = None,
                              token_address: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -410,13 +683,14 @@ class ParityManager:
         self.ethereum_node_url = ethereum_client.ethereum_node_url
 
     #TODO Test with mock
-    def _decode_trace_action(self, action: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _decode_trace_action(action: Dict[str, Any]) -> Dict[str, Any]:
         decoded = {
         }
 
         # CALL, DELEGATECALL, CREATE or CREATE2
         if 'from' in action:
-            decoded['from'] = self.w3.toChecksumAddress(action['from'])
+            decoded['from'] = Web3.toChecksumAddress(action['from'])
         if 'gas' in action:
             decoded['gas'] = int(action['gas'], 16)
         if 'value' in action:
@@ -428,7 +702,7 @@ class ParityManager:
         if 'input' in action:
             decoded['input'] = HexBytes(action['input'])
         if 'to' in action:
-            decoded['to'] = self.w3.toChecksumAddress(action['to'])
+            decoded['to'] = Web3.toChecksumAddress(action['to'])
 
         # CREATE or CREATE2
         if 'init' in action:
@@ -436,15 +710,16 @@ class ParityManager:
 
         # SELF-DESTRUCT
         if 'address' in action:
-            decoded['address'] = self.w3.toChecksumAddress(action['address'])
+            decoded['address'] = Web3.toChecksumAddress(action['address'])
         if 'balance' in action:
             decoded['balance'] = int(action['balance'], 16)
         if 'refundAddress' in action:
-            decoded['refundAddress'] = self.w3.toChecksumAddress(action['refundAddress'])
+            decoded['refundAddress'] = Web3.toChecksumAddress(action['refundAddress'])
 
         return decoded
 
-    def _decode_trace_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _decode_trace_result(result: Dict[str, Any]) -> Dict[str, Any]:
         decoded: Dict[str, Any] = {
             'gasUsed': int(result['gasUsed'], 16),
         }
@@ -457,11 +732,12 @@ class ParityManager:
         if 'code' in result:
             decoded['code'] = HexBytes(result['code'])
         if 'address' in result:
-            decoded['address'] = self.w3.toChecksumAddress(result['address'])
+            decoded['address'] = Web3.toChecksumAddress(result['address'])
 
         return decoded
 
-    def _decode_traces(self, traces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    @classmethod
+    def _decode_traces(cls, traces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         new_traces = []
         for trace in traces:
             if not isinstance(trace, dict):
@@ -471,8 +747,8 @@ class ParityManager:
             # Txs with `error` field don't have `result` field
             # Txs with `type=suicide` have `result` field but is `None`
             if 'result' in trace and trace['result']:
-                trace_copy['result'] = self._decode_trace_result(trace['result'])
-            trace_copy['action'] = self._decode_trace_action(trace['action'])
+                trace_copy['result'] = cls._decode_trace_result(trace['result'])
+            trace_copy['action'] = cls._decode_trace_action(trace['action'])
         return new_traces
 
     def trace_transaction(self, tx_hash: EthereumHash) -> List[Dict[str, Any]]:
@@ -482,27 +758,55 @@ class ParityManager:
             logger.warning('Problem decoding trace: %s - Retrying', exc)
             return self._decode_traces(self.slow_w3.parity.traceTransaction(tx_hash))
 
-    def trace_transactions(self, tx_hashes: List[EthereumHash]) -> List[List[Dict[str, Any]]]:
-        if not tx_hashes:
-            return []
-        payload = [{'id': i, 'jsonrpc': '2.0', 'method': 'trace_transaction',
-                    'params': [HexBytes(tx_hash).hex()]}
-                   for i, tx_hash in enumerate(tx_hashes)]
-        results = requests.post(self.ethereum_node_url, json=payload).json()
+    @staticmethod
+    def _build_trace_transactions_payload(tx_hashes: List[EthereumHash]) -> List[Dict[str, Any]]:
+        return [{'id': i, 'jsonrpc': '2.0', 'method': 'trace_transaction',
+                 'params': [HexBytes(tx_hash).hex()]}
+                for i, tx_hash in enumerate(tx_hashes)]
+
+    @classmethod
+    def _parse_trace_transactions(cls, results: List[Dict[str, Any]]) -> List[Optional[List[Dict[str, Any]]]]:
         traces = []
         for result in results:
             raw_tx = result['result']
             if raw_tx:
                 try:
-                    decoded_traces = self._decode_traces(raw_tx)
+                    decoded_traces = cls._decode_traces(raw_tx)
                 except ParityTraceDecodeException as exc:
                     logger.warning('Problem decoding trace: %s - Retrying', exc)
-                    decoded_traces = self._decode_traces(raw_tx)
+                    decoded_traces = cls._decode_traces(raw_tx)
                 traces.append(decoded_traces)
             else:
                 traces.append(None)
         return traces
 
+    def trace_transactions(self, tx_hashes: List[EthereumHash]) -> List[List[Dict[str, Any]]]:
+        if not tx_hashes:
+            return []
+        payload = self._build_trace_transactions_payload(tx_hashes)
+        return self._parse_trace_transactions(self.ethereum_client.raw_batch_request(payload))
+
+    @staticmethod
+    def _build_trace_filter_parameters(from_block: int = 1, to_block: Optional[int] = None,
+                                       from_address: Optional[List[str]] = None,
+                                       to_address: Optional[List[str]] = None,
+                                       after: Optional[int] = None, count: Optional[int] = None) -> Dict[str, Any]:
+        assert from_address or to_address, 'You must provide at least `from_address` or `to_address`'
+        parameters: Dict[str, Any] = {}
+        if from_block:
+            parameters['fromBlock'] = '0x%x' % from_block
+        if to_block:
+            parameters['toBlock'] = '0x%x' % to_block
+        if from_address:
+            parameters['fromAddress'] = from_address
+        if to_address:
+            parameters['toAddress'] = to_address
+        if after:
+            parameters['after'] = after
+        if count:
+            parameters['count'] = count
+        return parameters
+
     def trace_filter(self, from_block: int = 1, to_block: Optional[int] = None,
                      from_address: Optional[List[str]] = None, to_address: Optional[List[str]] = None,
                      after: Optional[int] = None, count: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -574,21 +878,9 @@ class ParityManager:
           ...
         ]
         """
-        assert from_address or to_address, 'You must provide at least `from_address` or `to_address`'
-        parameters: Dict[str, Any] = {}
-        if from_block:
-            parameters['fromBlock'] = '0x%x' % from_block
-        if to_block:
-            parameters['toBlock'] = '0x%x' % to_block
-        if from_address:
-            parameters['fromAddress'] = from_address
-        if to_address:
-            parameters['toAddress'] = to_address
-        if after:
-            parameters['after'] = after
-        if count:
-            parameters['count'] = count
-
+        parameters = self._build_trace_filter_parameters(from_block=from_block, to_block=to_block,
+                                                         from_address=from_address, to_address=to_address,
+                                                         after=after, count=count)
         try:
             return self._decode_traces(self.slow_w3.parity.traceFilter(parameters))
         except ParityTraceDecodeException as exc:
@@ -603,11 +895,34 @@ class EthereumClient:
     """
     NULL_ADDRESS = NULL_ADDRESS
 
-    def __init__(self, ethereum_node_url: str = 'http://localhost:8545', slow_provider_timeout: int = 200):
+    def __init__(self, ethereum_node_url: str = 'http://localhost:8545', slow_provider_timeout: int = 200,
+                 provider_timeout: int = 10, retry_count: int = 3, pool_size: int = 10,
+                 batch_request_max_size: int = 500, batch_request_max_workers: int = 4,
+                 batch_request_retries: int = 2, erc20_info_cache: Optional[BaseCache] = None):
+        """
+        :param ethereum_node_url: Ethereum RPC uri
+        :param slow_provider_timeout: Timeout (seconds) for slow and batch queries (`eth_getLogs`, traces...)
+        :param provider_timeout: Timeout (seconds) for regular queries
+        :param retry_count: Retries on connection errors. Reads are not retried, as txs could be sent twice
+        :param pool_size: Maximum number of connections to the node kept alive in the pool
+        :param batch_request_max_size: Maximum number of queries sent to the node on every JSON-RPC batch
+        :param batch_request_max_workers: Number of JSON-RPC batches sent to the node concurrently
+        :param batch_request_retries: Retries for every JSON-RPC batch that fails
+        :param erc20_info_cache: Cache for erc20 tokens metadata, e.g. `gnosis.eth.django.cache.DjangoCache`.
+        If not provided, an in-process `LRUCache` will be used
+        """
         self.ethereum_node_url: str = ethereum_node_url
-        self.w3_provider = HTTPProvider(self.ethereum_node_url)
+        self.slow_provider_timeout = slow_provider_timeout
+        self.provider_timeout = provider_timeout
+        self.batch_request_max_size = batch_request_max_size
+        self.batch_request_max_workers = batch_request_max_workers
+        self.batch_request_retries = batch_request_retries
+        self._batch_request_executor: Optional[ThreadPoolExecutor] = None
+        self.http_session = self._prepare_http_session(retry_count, pool_size)
+        self.w3_provider = HTTPProviderWithSession(self.ethereum_node_url, self.http_session,
+                                                   request_kwargs={'timeout': provider_timeout})
         self.w3: Web3 = Web3(self.w3_provider)
-        self.erc20: Erc20Manager = Erc20Manager(self, slow_provider_timeout)
+        self.erc20: Erc20Manager = Erc20Manager(self, slow_provider_timeout, info_cache=erc20_info_cache)
         self.parity: ParityManager = ParityManager(self, slow_provider_timeout)
         try:
             if int(self.w3.net.version) != 1:
@@ -639,21 +954,115 @@ class EthereumClient:
 
         return EthereumTxSent(tx_hash, tx, contract_address)
 
+    @staticmethod
+    def _prepare_http_session(retry_count: int, pool_size: int) -> requests.Session:
+        """
+        Prepare http session with a pool of keep-alive connections, shared by web3 providers and the raw
+        JSON-RPC requests, so TCP/TLS handshakes are done just once per connection
+        :param retry_count: Retries on connection errors
+        :param pool_size: Number of connections kept alive
+        :return: `requests.Session`
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1,  # Doing all the connections to the same url
+                              pool_maxsize=pool_size,
+                              max_retries=retry_count,  # Nodes have a tendency to drop connections
+                              pool_block=False)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
     def get_slow_provider(self, timeout: int):
         """
         Get web3 provider for slow queries. Default `HTTPProvider` timeouts after 10 seconds
         :param timeout: Timeout to configure for internal requests
-        :return: A new web3 provider with the `slow_provider_timeout`
+        :return: A new web3 provider with the `slow_provider_timeout`, sharing the http session
         """
         if isinstance(self.w3_provider, AutoProvider):
-            return HTTPProvider(endpoint_uri='http://localhost:8545',
-                                request_kwargs={'timeout': timeout})
+            return HTTPProviderWithSession(endpoint_uri='http://localhost:8545', session=self.http_session,
+                                           request_kwargs={'timeout': timeout})
         elif isinstance(self.w3_provider, HTTPProvider):
-            return HTTPProvider(endpoint_uri=self.w3_provider.endpoint_uri,
-                                request_kwargs={'timeout': timeout})
+            return HTTPProviderWithSession(endpoint_uri=self.w3_provider.endpoint_uri, session=self.http_session,
+                                           request_kwargs={'timeout': timeout})
         else:
             return self.w3_provider
 
+    @property
+    def batch_request_executor(self) -> ThreadPoolExecutor:
+        if not self._batch_request_executor:
+            self._batch_request_executor = ThreadPoolExecutor(max_workers=self.batch_request_max_workers)
+        return self._batch_request_executor
+
+    def _send_batch_request(self, payload: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send one JSON-RPC batch to the node, retrying it if something goes wrong
+        :param payload: JSON-RPC queries with `id` set to their position in the original request
+        :return: Responses sorted by `id`
+        :raises: BatchRequestException
+        """
+        for retry in range(self.batch_request_retries + 1):
+            try:
+                response = self.http_session.post(self.ethereum_node_url, json=payload,
+                                                  timeout=self.slow_provider_timeout)
+                if not response.ok:
+                    raise BatchRequestException('Error %d sending batch request: %s' % (response.status_code,
+                                                                                        response.content))
+                results = response.json()
+                # If the whole batch fails some nodes return a dictionary with `error` instead of a list
+                if not isinstance(results, list) or len(results) != len(payload):
+                    raise BatchRequestException('Unexpected response for batch request: %s' % results)
+                results.sort(key=lambda result: result.get('id') or 0)
+                if [result.get('id') for result in results] != [query['id'] for query in payload]:
+                    raise BatchRequestException('Responses ids for batch request do not match the queries')
+                return results
+            except (requests.RequestException, ValueError) as exc:  # `BatchRequestException` is a `ValueError`
+                if retry < self.batch_request_retries:
+                    logger.warning('Problem sending batch request with %d queries: %s - Retrying', len(payload), exc)
+                elif isinstance(exc, BatchRequestException):
+                    raise
+                else:
+                    raise BatchRequestException(str(exc)) from exc
+
+    def iter_raw_batch_request(self, payload: Sequence[Dict[str, Any]],
+                               batch_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Split the JSON-RPC queries in batches of `batch_size` and send them concurrently to the node, using
+        up to `batch_request_max_workers` threads. Only batches that fail are retried.
+        :param payload: JSON-RPC queries
+        :param batch_size: Maximum number of queries per batch. If not provided, `batch_request_max_size`
+        :return: Iterator with a response for every query, in the same order of the `payload`. Responses are
+        yielded as soon as every previous batch is received
+        :raises: BatchRequestException
+        """
+        batch_size = batch_size or self.batch_request_max_size
+        # Set `id` to the position of the query, so responses can be sorted back
+        payload = [dict(query, id=i) for i, query in enumerate(payload)]
+        if len(payload) <= batch_size:
+            if payload:
+                yield from self._send_batch_request(payload)
+            return
+
+        # Keep a bounded number of batches in flight, so memory usage does not depend on the payload size
+        max_pending = self.batch_request_max_workers * 2
+        pending: Deque = deque()
+        for batch in chunks(payload, batch_size):
+            pending.append(self.batch_request_executor.submit(self._send_batch_request, batch))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def raw_batch_request(self, payload: Sequence[Dict[str, Any]],
+                          batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Same as `iter_raw_batch_request`, but returns a list
+        :param payload: JSON-RPC queries
+        :param batch_size: Maximum number of queries per batch. If not provided, `batch_request_max_size`
+        :return: List with a response for every query, in the same order of the `payload`
+        :raises: BatchRequestException
+        """
+        return list(self.iter_raw_batch_request(payload, batch_size=batch_size))
+
     def get_network(self) -> EthereumNetwork:
         """
         Get network name based on the network version id
@@ -675,7 +1084,9 @@ class EthereumClient:
     def current_block_number(self):
         return self.w3.eth.blockNumber
 
-    def estimate_gas(self, from_: str, to: str, value: int, data: bytes, block_identifier: Optional[str] = 'latest'):
+    @staticmethod
+    def _build_estimate_gas_payload(from_: str, to: str, value: int, data: bytes,
+                                    block_identifier: Optional[str] = 'latest') -> Dict[str, Any]:
         data = data or b''
         params: List[Union[Dict[str, Any], str]] = [
             {"from": from_,
@@ -688,14 +1099,17 @@ class EthereumClient:
         if block_identifier:
             params.append(block_identifier)
 
-        payload = {
+        return {
             "method": "eth_estimateGas",
             "params": params,
             "jsonrpc": "2.0",
             "id": 1
         }
 
-        response = requests.post(url=self.ethereum_node_url, json=payload)
+    def estimate_gas(self, from_: str, to: str, value: int, data: bytes, block_identifier: Optional[str] = 'latest'):
+        data = data or b''
+        payload = self._build_estimate_gas_payload(from_, to, value, data, block_identifier=block_identifier)
+        response = self.http_session.post(self.ethereum_node_url, json=payload, timeout=self.provider_timeout)
         response_json = response.json()
         if 'error' in response_json:
             # When using `pending`, Geth returns
@@ -722,17 +1136,26 @@ class EthereumClient:
             return int(response_json['result'], 16)
 
     @staticmethod
-    def estimate_data_gas(data: bytes):
+    def estimate_data_gas(data: Union[bytes, str]) -> int:
+        """
+        :param data: Calldata
+        :return: Gas cost of the calldata. Zero bytes are counted in C with `bytes.count`
+        """
         if isinstance(data, str):
             data = HexBytes(data)
+        elif not isinstance(data, (bytes, bytearray)):  # e.g. `memoryview`
+            data = bytes(data)
 
-        gas = 0
-        for byte in data:
-            if not byte:
-                gas += GAS_CALL_DATA_ZERO_BYTE
-            else:
-                gas += GAS_CALL_DATA_BYTE
-        return gas
+        zero_bytes = data.count(0)
+        return zero_bytes * GAS_CALL_DATA_ZERO_BYTE + (len(data) - zero_bytes) * GAS_CALL_DATA_BYTE
+
+    @classmethod
+    def estimate_data_gas_many(cls, datas: Iterable[Union[bytes, str]]) -> List[int]:
+        """
+        :param datas: Calldatas
+        :return: Gas cost of every calldata
+        """
+        return [cls.estimate_data_gas(data) for data in datas]
 
     def get_balance(self, address: str, block_identifier=None):
         return self.w3.eth.getBalance(address, block_identifier)
@@ -743,21 +1166,22 @@ class EthereumClient:
         except TransactionNotFound:
             return None
 
+    @staticmethod
+    def _build_transactions_payload(tx_hashes: List[EthereumHash]) -> List[Dict[str, Any]]:
+        return [{'id': i, 'jsonrpc': '2.0', 'method': 'eth_getTransactionByHash',
+                 'params': [HexBytes(tx_hash).hex()]}
+                for i, tx_hash in enumerate(tx_hashes)]
+
+    @staticmethod
+    def _parse_transaction(raw_tx: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        return transaction_formatter(raw_tx) if raw_tx else None
+
     def get_transactions(self, tx_hashes: List[EthereumHash]) -> List[Optional[Dict[str, Any]]]:
         if not tx_hashes:
             return []
-        payload = [{'id': i, 'jsonrpc': '2.0', 'method': 'eth_getTransactionByHash',
-                    'params': [HexBytes(tx_hash).hex()]}
-                   for i, tx_hash in enumerate(tx_hashes)]
-        results = requests.post(self.ethereum_node_url, json=payload).json()
-        txs = []
-        for result in results:
-            raw_tx = result['result']
-            if raw_tx:
-                txs.append(transaction_formatter(raw_tx))
-            else:
-                txs.append(None)
-        return txs
+        payload = self._build_transactions_payload(tx_hashes)
+        results = self.raw_batch_request(payload)
+        return [self._parse_transaction(result['result']) for result in results]
 
     def get_transaction_receipt(self, tx_hash: EthereumHash, timeout=None) -> Optional[Dict[str, Any]]:
         try:
@@ -774,22 +1198,26 @@ class EthereumClient:
         except TransactionNotFound:
             return None
 
-    def get_transaction_receipts(self, tx_hashes: EthereumHash) -> List[Optional[Dict[str, Any]]]:
+    @staticmethod
+    def _build_transaction_receipts_payload(tx_hashes: List[EthereumHash]) -> List[Dict[str, Any]]:
+        return [{'id': i, 'jsonrpc': '2.0', 'method': 'eth_getTransactionReceipt',
+                 'params': [HexBytes(tx_hash).hex()]}
+                for i, tx_hash in enumerate(tx_hashes)]
+
+    @staticmethod
+    def _parse_transaction_receipt(tx_receipt: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        # Parity returns tx_receipt even is tx is still pending, so we check `blockNumber` is not None
+        if tx_receipt and tx_receipt['blockNumber'] is not None:
+            return receipt_formatter(tx_receipt)
+        else:
+            return None
+
+    def get_transaction_receipts(self, tx_hashes: List[EthereumHash]) -> List[Optional[Dict[str, Any]]]:
         if not tx_hashes:
             return []
-        payload = [{'id': i, 'jsonrpc': '2.0', 'method': 'eth_getTransactionReceipt',
-                    'params': [HexBytes(tx_hash).hex()]}
-                   for i, tx_hash in enumerate(tx_hashes)]
-        results = requests.post(self.ethereum_node_url, json=payload).json()
-        receipts = []
-        for result in results:
-            tx_receipt = result['result']
-            # Parity returns tx_receipt even is tx is still pending, so we check `blockNumber` is not None
-            if tx_receipt and tx_receipt['blockNumber'] is not None:
-                receipts.append(receipt_formatter(tx_receipt))
-            else:
-                receipts.append(None)
-        return receipts
+        payload = self._build_transaction_receipts_payload(tx_hashes)
+        results = self.raw_batch_request(payload)
+        return [self._parse_transaction_receipt(result['result']) for result in results]
 
     def get_block(self, block_number: int, full_transactions=False) -> Optional[Dict[str, Any]]:
         try:
@@ -797,23 +1225,27 @@ class EthereumClient:
         except BlockNotFound:
             return None
 
+    @staticmethod
+    def _build_blocks_payload(block_numbers: List[int], full_transactions=False) -> List[Dict[str, Any]]:
+        return [{'id': i, 'jsonrpc': '2.0', 'method': 'eth_getBlockByNumber',
+                 'params': [hex(block_number), full_transactions]}
+                for i, block_number in enumerate(block_numbers)]
+
+    @staticmethod
+    def _parse_block(raw_block: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if raw_block:
+            if 'extraData' in raw_block:
+                del raw_block['extraData']  # Remove extraData, raises some problems on parsing
+            return block_formatter(raw_block)
+        else:
+            return None
+
     def get_blocks(self, block_numbers: List[int], full_transactions=False) -> List[Optional[Dict[str, Any]]]:
         if not block_numbers:
             return []
-        payload = [{'id': i, 'jsonrpc': '2.0', 'method': 'eth_getBlockByNumber',
-                    'params': [hex(block_number), full_transactions]}
-                   for i, block_number in enumerate(block_numbers)]
-        results = requests.post(self.ethereum_node_url, json=payload).json()
-        blocks = []
-        for result in results:
-            raw_block = result['result']
-            if raw_block:
-                if 'extraData' in raw_block:
-                    del raw_block['extraData']  # Remove extraData, raises some problems on parsing
-                blocks.append(block_formatter(raw_block))
-            else:
-                blocks.append(None)
-        return blocks
+        payload = self._build_blocks_payload(block_numbers, full_transactions=full_transactions)
+        results = self.raw_batch_request(payload)
+        return [self._parse_block(result['result']) for result in results]
 
     def is_contract(self, contract_address: str):
         return bool(self.w3.eth.getCode(contract_address))
@@ -0,0 +1,86 @@
+import asyncio
+
+from django.test import TestCase
+
+from eth_account import Account
+
+from ..async_ethereum_client import AsyncEthereumClient
+from ..ethereum_client import InvalidERC20Info
+from .ethereum_test_case import EthereumTestCaseMixin
+
+
+class TestAsyncEthereumClient(EthereumTestCaseMixin, TestCase):
+    def run_with_client(self, fn):
+        async def run():
+            async with AsyncEthereumClient(self.ethereum_client.ethereum_node_url,
+                                           batch_request_max_size=2) as async_ethereum_client:
+                return await fn(async_ethereum_client)
+
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+    def test_get_transactions_and_blocks(self):
+        to = Account.create().address
+        values = [123, 234, 567]
+        tx_hashes = [self.send_ether(to, value) for value in values]
+
+        async def fn(async_ethereum_client: AsyncEthereumClient):
+            return await asyncio.gather(async_ethereum_client.get_transactions(tx_hashes),
+                                        async_ethereum_client.get_transaction_receipts(tx_hashes),
+                                        async_ethereum_client.get_transaction(tx_hashes[0]),
+                                        async_ethereum_client.get_transaction_receipt(tx_hashes[0]),
+                                        async_ethereum_client.get_transactions([]))
+
+        txs, receipts, tx, receipt, empty_txs = self.run_with_client(fn)
+        self.assertEqual(txs, self.ethereum_client.get_transactions(tx_hashes))
+        self.assertEqual(receipts, self.ethereum_client.get_transaction_receipts(tx_hashes))
+        self.assertEqual(tx, txs[0])
+        self.assertEqual(receipt, receipts[0])
+        self.assertEqual(empty_txs, [])
+        self.assertEqual([tx['value'] for tx in txs], values)
+
+        block_numbers = [receipt['blockNumber'] for receipt in receipts]
+
+        async def fn(async_ethereum_client: AsyncEthereumClient):
+            return await asyncio.gather(async_ethereum_client.get_blocks(block_numbers, full_transactions=True),
+                                        async_ethereum_client.get_block(block_numbers[0]),
+                                        async_ethereum_client.current_block_number)
+
+        blocks, block, current_block_number = self.run_with_client(fn)
+        self.assertEqual(blocks, self.ethereum_client.get_blocks(block_numbers, full_transactions=True))
+        self.assertEqual(block, self.ethereum_client.get_blocks([block_numbers[0]])[0])
+        self.assertEqual(current_block_number, self.ethereum_client.current_block_number)
+
+    def test_estimate_gas(self):
+        from_ = self.ethereum_test_account.address
+        to = Account.create().address
+
+        async def fn(async_ethereum_client: AsyncEthereumClient):
+            return await async_ethereum_client.estimate_gas(from_, to, 5, None)
+
+        self.assertEqual(self.run_with_client(fn), self.ethereum_client.estimate_gas(from_, to, 5, None))
+
+    def test_erc20(self):
+        account_address = Account.create().address
+        erc20 = self.deploy_example_erc20(12, account_address)
+        erc20_2 = self.deploy_example_erc20(19, account_address)
+
+        async def fn(async_ethereum_client: AsyncEthereumClient):
+            return await asyncio.gather(
+                async_ethereum_client.erc20.get_balances(account_address, [erc20.address, erc20_2.address]),
+                async_ethereum_client.erc20.get_info(erc20.address),
+            )
+
+        balances, erc20_info = self.run_with_client(fn)
+        self.assertEqual(balances, self.ethereum_client.erc20.get_balances(account_address,
+                                                                           [erc20.address, erc20_2.address]))
+        self.assertEqual(erc20_info, self.ethereum_client.erc20.get_info(erc20.address))
+
+        async def fn(async_ethereum_client: AsyncEthereumClient):
+            return await async_ethereum_client.erc20.get_info(Account.create().address)
+
+        with self.assertRaises(InvalidERC20Info):
+            self.run_with_client(fn)
@@ -0,0 +1,21 @@
+from django.test import TestCase
+
+from ..cache import LRUCache
+
+
+class TestCache(TestCase):
+    def test_lru_cache(self):
+        cache = LRUCache(maxsize=2)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('a', 1), 1)
+        cache.set_many({'a': 1, 'b': 2})
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 2})
+
+        # `b` is the least recently used
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': 1, 'c': 3})
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
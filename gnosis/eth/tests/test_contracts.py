@@ -0,0 +1,70 @@
+import gc
+import weakref
+
+from django.test import TestCase
+
+from eth_account import Account
+from hexbytes import HexBytes
+from web3 import Web3
+
+from ..constants import NULL_ADDRESS
+from ..contracts import (_get_function_encoder, encode_contract_function,
+                         get_erc20_contract, get_multi_send_contract,
+                         get_safe_contract, load_contract_interface)
+from .ethereum_test_case import EthereumTestCaseMixin
+
+
+class TestContracts(EthereumTestCaseMixin, TestCase):
+    def test_get_contract_cache(self):
+        w3 = self.w3
+        address = Account.create().address
+        address_2 = Account.create().address
+
+        erc20_factory = get_erc20_contract(w3)
+        self.assertIs(get_erc20_contract(w3), erc20_factory)
+        self.assertIsNot(get_safe_contract(w3), erc20_factory)
+        self.assertIsNone(erc20_factory.address)
+
+        erc20 = get_erc20_contract(w3, address)
+        self.assertEqual(erc20.address, address)
+        self.assertIsInstance(erc20, erc20_factory)
+        self.assertIs(get_erc20_contract(w3, address), erc20)
+        self.assertEqual(get_erc20_contract(w3, address_2).address, address_2)
+        self.assertEqual(get_safe_contract(w3, address).address, address)
+        self.assertIsNot(get_safe_contract(w3, address), erc20)
+
+        # Factories are not shared between `Web3` instances
+        other_w3 = Web3(w3.provider)
+        self.assertIsNot(get_erc20_contract(other_w3), erc20_factory)
+        self.assertIs(get_erc20_contract(other_w3, address).web3, other_w3)
+
+        # Cached factories and instances do not keep the `Web3` instance alive
+        other_w3_ref = weakref.ref(other_w3)
+        del other_w3
+        gc.collect()
+        self.assertIsNone(other_w3_ref())
+
+    def test_load_contract_interface(self):
+        contract_interface = load_contract_interface('ERC20.json')
+        self.assertIn('abi', contract_interface)
+        self.assertIs(load_contract_interface('ERC20.json'), contract_interface)
+
+    def test_encode_contract_function(self):
+        owners = [Account.create().address for _ in range(3)]
+        setup_arguments = [owners, 2, NULL_ADDRESS, b'', NULL_ADDRESS, NULL_ADDRESS, 0, NULL_ADDRESS]
+        self.assertEqual(encode_contract_function('safe', 'setup', setup_arguments),
+                         HexBytes(get_safe_contract(self.w3).functions.setup(
+                             *setup_arguments).buildTransaction({'gas': 1, 'gasPrice': 1})['data']))
+
+        data = HexBytes('0xabcdef')
+        expected = HexBytes(get_multi_send_contract(self.w3).functions.multiSend(
+            data).buildTransaction({'gas': 1, 'gasPrice': 1})['data'])
+        self.assertEqual(encode_contract_function('multi_send', 'multiSend', [data]), expected)
+        self.assertEqual(encode_contract_function('multi_send', 'multiSend', [data.hex()]), expected)
+
+        # Only dynamic `bytes` arguments are converted from hex strings
+        self.assertEqual(_get_function_encoder('safe', 'approveHash', 1)[2], [])
+        self.assertEqual(_get_function_encoder('safe', 'execTransaction', 10)[2], [2, 9])
+
+        with self.assertRaises(ValueError):
+            encode_contract_function('multi_send', 'notExisting', [])
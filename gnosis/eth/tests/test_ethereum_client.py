@@ -2,16 +2,18 @@ from unittest import mock
 
 from django.test import TestCase
 
+import requests
 from eth_account import Account
 from hexbytes import HexBytes
 from web3.datastructures import AttributeDict
 from web3.net import Net
 
-from ..constants import GAS_CALL_DATA_BYTE
-from ..ethereum_client import (EthereumClientProvider, EthereumNetwork,
-                               FromAddressNotFound, InsufficientFunds,
-                               InvalidERC20Info, InvalidNonce,
-                               SenderAccountNotFoundInNode)
+from ..constants import GAS_CALL_DATA_BYTE, NULL_ADDRESS
+from ..ethereum_client import (BatchRequestException, Erc20Manager,
+                               EthereumClient, EthereumClientProvider,
+                               EthereumNetwork, FromAddressNotFound,
+                               InsufficientFunds, InvalidERC20Info,
+                               InvalidNonce, SenderAccountNotFoundInNode)
 from ..utils import get_eth_address_with_key
 from .ethereum_test_case import EthereumTestCaseMixin
 
@@ -170,6 +172,59 @@ class TestERC20Module(EthereumTestCaseMixin, TestCase):
                                {'token_address': erc20_2.address, 'balance': tokens_value_2}
                                ])
 
+        # Errors are not ignored, unlike `get_balances_matrix`
+        with mock.patch.object(self.ethereum_client, 'raw_batch_request',
+                               return_value=[{'id': 0, 'jsonrpc': '2.0', 'result': '0x1'},
+                                             {'id': 1, 'jsonrpc': '2.0', 'error': {'code': -32000,
+                                                                                   'message': 'error'}}]):
+            with self.assertRaises(KeyError):
+                self.ethereum_client.erc20.get_balances(account_address, [erc20.address])
+
+    def test_get_balances_matrix(self):
+        owner_1, owner_2, owner_3 = [Account.create().address for _ in range(3)]
+        self.send_ether(owner_1, 7)
+        erc20 = self.deploy_example_erc20(12, owner_1)
+        erc20_2 = self.deploy_example_erc20(19, owner_2)
+        not_erc20_address = Account.create().address
+        owners = [owner_1, owner_2, owner_3]
+        tokens = [NULL_ADDRESS, erc20.address, erc20_2.address, not_erc20_address]
+        expected_balances = [[7, 12, 0, 0],
+                             [0, 0, 19, 0],
+                             [0, 0, 0, 0]]
+        block_number = self.ethereum_client.current_block_number
+        with mock.patch.object(self.ethereum_client, 'batch_request_max_size', 2):
+            balances_matrix = self.ethereum_client.erc20.get_balances_matrix(owners, tokens)
+        self.assertEqual(balances_matrix.owners, owners)
+        self.assertEqual(balances_matrix.tokens, tokens)
+        self.assertEqual(balances_matrix.balances, expected_balances)
+        self.assertEqual(balances_matrix.get_balance(owner_2, erc20_2.address), 19)
+        with self.assertRaises(KeyError):
+            balances_matrix.get_balance(not_erc20_address, erc20_2.address)
+
+        balances_matrix = self.ethereum_client.erc20.get_balances_matrix(owners, tokens,
+                                                                         block_identifier=block_number)
+        self.assertEqual(balances_matrix.balances, expected_balances)
+
+        self.assertEqual(self.ethereum_client.erc20.get_balances_matrix(owners, []).balances, [[], [], []])
+        self.assertEqual(self.ethereum_client.erc20.get_balances_matrix([], tokens).balances, [])
+
+        # Errors for an entry don't affect the other ones
+        iter_raw_batch_request = self.ethereum_client.iter_raw_batch_request
+
+        def iter_raw_batch_request_with_errors(payload, *args, **kwargs):
+            for query, result in zip(payload, iter_raw_batch_request(payload, *args, **kwargs)):
+                if query['method'] == 'eth_call' and query['params'][0]['to'] == erc20.address:
+                    yield {'id': result['id'], 'jsonrpc': '2.0', 'error': {'code': -32000, 'message': 'error'}}
+                else:
+                    yield result
+
+        with mock.patch.object(self.ethereum_client, 'iter_raw_batch_request',
+                               side_effect=iter_raw_batch_request_with_errors):
+            balances_matrix = self.ethereum_client.erc20.get_balances_matrix(owners, tokens)
+        self.assertEqual(balances_matrix.balances, [[7, None, 0, 0],
+                                                    [0, None, 19, 0],
+                                                    [0, None, 0, 0]])
+
     def test_get_blocks(self):
         self.assertEqual(self.ethereum_client.get_blocks([]), [])
         # Generate 3 blocks
@@ -227,6 +282,61 @@ class TestERC20Module(EthereumTestCaseMixin, TestCase):
         logs = self.ethereum_client.erc20.get_total_transfer_history([account_2.address, account_3.address])
         self.assertEqual(len(logs), 2)
 
+    def test_iter_total_transfer_history(self):
+        amount = 50
+        owner_account = self.create_account(initial_ether=0.01)
+        account_1 = self.create_account(initial_ether=0.01)
+        account_2 = self.create_account(initial_ether=0.01)
+        from_block = self.ethereum_client.current_block_number
+        erc20_contract = self.deploy_example_erc20(amount, owner_account.address)
+        for account, value in ((account_1, 5), (account_2, 6), (account_1, 7)):
+            self.send_tx(erc20_contract.functions.transfer(account.address,
+                                                           value).buildTransaction({'from': owner_account.address}),
+                         owner_account)
+        self.send_tx(erc20_contract.functions.transfer(account_2.address,
+                                                       3).buildTransaction({'from': account_1.address}),
+                     account_1)
+
+        addresses = [account_1.address]
+        expected_logs = self.ethereum_client.erc20.get_total_transfer_history(addresses, from_block=from_block)
+        self.assertEqual([log['args']['value'] for log in expected_logs], [5, 7, 3])
+        for block_window in (1, 2, 100):
+            logs = list(self.ethereum_client.erc20.iter_total_transfer_history(addresses, from_block=from_block,
+                                                                               block_window=block_window))
+            self.assertEqual([(log['blockNumber'], log['args']) for log in logs],
+                             [(log['blockNumber'], log['args']) for log in expected_logs])
+            self.assertIsInstance(logs[0], AttributeDict)
+
+        # Windows are fetched by the executor, they must not wait for other tasks on it
+        ethereum_client = EthereumClient(self.ethereum_client.ethereum_node_url, batch_request_max_size=1,
+                                         batch_request_max_workers=1)
+        logs = list(ethereum_client.erc20.iter_total_transfer_history(addresses, from_block=from_block,
+                                                                      block_window=1))
+        self.assertEqual([log['args']['value'] for log in logs], [5, 7, 3])
+
+        # Node fails for windows with more than 1 block, windows are split
+        send_batch_request = self.ethereum_client._send_batch_request
+
+        def send_batch_request_failing(payload):
+            parameters = payload[0]['params'][0]
+            if int(parameters['toBlock'], 16) > int(parameters['fromBlock'], 16):
+                return [{'id': 0, 'jsonrpc': '2.0',
+                         'error': {'code': -32005, 'message': 'query returned more than 10000 results'}}]
+            return send_batch_request(payload)
+
+        with mock.patch.object(self.ethereum_client, '_send_batch_request', side_effect=send_batch_request_failing):
+            logs = list(self.ethereum_client.erc20.iter_total_transfer_history([account_2.address],
+                                                                               from_block=from_block))
+            self.assertEqual([log['args']['value'] for log in logs], [6, 3])
+
+        # Windows of 1 block cannot be split
+        with mock.patch.object(self.ethereum_client, '_send_batch_request',
+                               return_value=[{'id': 0, 'jsonrpc': '2.0',
+                                              'error': {'code': -32000, 'message': 'unknown error'}}]):
+            with self.assertRaises(ValueError):
+                list(self.ethereum_client.erc20.iter_total_transfer_history([account_2.address],
+                                                                            from_block=from_block))
+
     def test_get_transfer_history(self):
         amount = 1000
         owner_account = self.create_account(initial_ether=0.01)
@@ -298,6 +408,41 @@ class TestERC20Module(EthereumTestCaseMixin, TestCase):
         with self.assertRaises(InvalidERC20Info):
             self.ethereum_client.erc20.get_info(Account.create().address)
 
+    def test_get_infos(self):
+        owner = Account.create().address
+        erc20_contract = self.deploy_example_erc20(1, owner)
+        erc20_contract_2 = self.deploy_example_erc20(2, owner)
+        not_erc20_address = Account.create().address
+        erc20 = Erc20Manager(self.ethereum_client, self.ethereum_client.slow_provider_timeout)
+        erc20_addresses = [erc20_contract.address, not_erc20_address, erc20_contract_2.address,
+                           erc20_contract.address]
+        with mock.patch.object(self.ethereum_client, 'raw_batch_request',
+                               wraps=self.ethereum_client.raw_batch_request) as raw_batch_request_mock:
+            erc20_infos = erc20.get_infos(erc20_addresses)
+            raw_batch_request_mock.assert_called_once()
+            self.assertEqual(len(raw_batch_request_mock.call_args[0][0]), 9)  # 3 queries for every unique token
+            self.assertEqual(erc20_infos, [self.ethereum_client.erc20.get_info(erc20_contract.address), None,
+                                           self.ethereum_client.erc20.get_info(erc20_contract_2.address),
+                                           self.ethereum_client.erc20.get_info(erc20_contract.address)])
+            self.assertEqual(erc20_infos[0].decimals, 18)
+
+            # Valid tokens are cached
+            raw_batch_request_mock.reset_mock()
+            self.assertEqual(erc20.get_infos([erc20_contract.address, erc20_contract_2.address]),
+                             [erc20_infos[0], erc20_infos[2]])
+            raw_batch_request_mock.assert_not_called()
+            self.assertEqual(erc20.get_infos([not_erc20_address]), [None])
+            raw_batch_request_mock.assert_called_once()
+            self.assertEqual(erc20.get_infos([]), [])
+
+            # Keys include the network and don't depend on the address case
+            raw_batch_request_mock.reset_mock()
+            self.assertEqual(erc20.get_infos([erc20_contract.address.lower()]), [erc20_infos[0]])
+            raw_batch_request_mock.assert_not_called()
+            network_id = int(self.w3.net.version)
+            self.assertEqual(erc20.info_cache.get(f'erc20-info:{network_id}:{erc20_contract.address.lower()}'),
+                             erc20_infos[0])
+
     def test_send_tokens(self):
         amount = 5
         owner = self.ethereum_test_account
@@ -557,6 +702,64 @@ class TestEthereumClient(EthereumTestCaseMixin, TestCase):
         self.assertEqual(self.ethereum_client.estimate_data_gas(HexBytes('0x050204000001')), GAS_CALL_DATA_BYTE * 4 + 4 * 2)
         self.assertEqual(self.ethereum_client.estimate_data_gas(HexBytes('0x00050204000001')),
                          4 + GAS_CALL_DATA_BYTE * 4 + 4 * 2)
+        self.assertEqual(self.ethereum_client.estimate_data_gas('0x00050204000001'),
+                         4 + GAS_CALL_DATA_BYTE * 4 + 4 * 2)
+        self.assertEqual(self.ethereum_client.estimate_data_gas(memoryview(b'\x00\x05')), 4 + GAS_CALL_DATA_BYTE)
+
+    def test_estimate_data_gas_many(self):
+        datas = [HexBytes(''), HexBytes('0x00'), '0x050204', b'\x00' * 1000 + b'\x01' * 1000]
+        self.assertEqual(self.ethereum_client.estimate_data_gas_many(datas),
+                         [0, 4, GAS_CALL_DATA_BYTE * 3, 4 * 1000 + GAS_CALL_DATA_BYTE * 1000])
+        self.assertEqual(self.ethereum_client.estimate_data_gas_many([]), [])
+
+    def test_http_session(self):
+        http_session = self.ethereum_client.http_session
+        self.assertEqual(self.ethereum_client.w3_provider.session, http_session)
+        self.assertEqual(self.ethereum_client.get_slow_provider(timeout=100).session, http_session)
+        self.assertEqual(self.ethereum_client.erc20.slow_w3.provider.session, http_session)
+        self.assertEqual(self.ethereum_client.parity.slow_w3.provider.session, http_session)
+
+        # Raw JSON-RPC calls are done using the pooled session too
+        with mock.patch.object(http_session, 'post', wraps=http_session.post) as post_mock:
+            self.assertEqual(self.ethereum_client.get_blocks([0])[0]['number'], 0)
+            self.assertGreaterEqual(self.ethereum_client.current_block_number, 0)
+            self.assertEqual(post_mock.call_count, 2)
+
+    def test_raw_batch_request(self):
+        self.assertEqual(self.ethereum_client.raw_batch_request([]), [])
+        for _ in range(3):
+            self.send_ether(Account.create().address, 1)
+
+        block_numbers = list(range(self.ethereum_client.current_block_number, -1, -1))
+        payload = [{'id': 5, 'jsonrpc': '2.0', 'method': 'eth_getBlockByNumber', 'params': [hex(block_number), False]}
+                   for block_number in block_numbers]
+        for batch_size in (None, 1, 2, 3):
+            results = self.ethereum_client.raw_batch_request(payload, batch_size=batch_size)
+            self.assertEqual([int(result['result']['number'], 16) for result in results], block_numbers)
+            self.assertEqual([result['id'] for result in results], list(range(len(block_numbers))))
+
+        # Just the failed batch is retried
+        http_session = self.ethereum_client.http_session
+        post = http_session.post
+        failed_ids = []
+
+        def post_failing_once(*args, **kwargs):
+            query_id = kwargs['json'][0]['id']
+            if query_id == 1 and not failed_ids:
+                failed_ids.append(query_id)
+                raise requests.ConnectionError()
+            return post(*args, **kwargs)
+
+        with mock.patch.object(http_session, 'post', side_effect=post_failing_once) as post_mock:
+            results = self.ethereum_client.raw_batch_request(payload, batch_size=1)
+            self.assertEqual([int(result['result']['number'], 16) for result in results], block_numbers)
+            self.assertEqual(post_mock.call_count, len(payload) + 1)
+            self.assertEqual(failed_ids, [1])
+
+        with mock.patch.object(http_session, 'post', side_effect=requests.ConnectionError()) as post_mock:
+            with self.assertRaises(BatchRequestException):
+                self.ethereum_client.raw_batch_request(payload)
+            self.assertEqual(post_mock.call_count, self.ethereum_client.batch_request_retries + 1)
 
     def test_provider_singleton(self):
         ethereum_client1 = EthereumClientProvider()
@@ -6,12 +6,18 @@ from hexbytes import HexBytes
 
 from ..contracts import (get_proxy_1_0_0_deployed_bytecode,
                          get_proxy_factory_contract)
-from ..utils import (compare_byte_code, decode_string_or_bytes32,
-                     generate_address_2)
+from ..utils import (chunks, compare_byte_code, decode_string_or_bytes32,
+                     generate_address_2,
+                     generate_address_2_from_init_code_hash)
 from .ethereum_test_case import EthereumTestCaseMixin
 
 
 class TestUtils(EthereumTestCaseMixin, TestCase):
+    def test_chunks(self):
+        self.assertEqual(list(chunks([], 5)), [])
+        self.assertEqual(list(chunks([1, 2, 3], 5)), [[1, 2, 3]])
+        self.assertEqual(list(chunks([1, 2, 3, 4, 5], 2)), [[1, 2], [3, 4], [5]])
+
     def test_generate_address_2(self):
         from_ = '0x8942595A2dC5181Df0465AF0D7be08c8f23C93af'
         salt = self.w3.keccak(text='aloha')
@@ -27,6 +33,11 @@ class TestUtils(EthereumTestCaseMixin, TestCase):
         address2 = generate_address_2(from_, salt, init_code)
         self.assertEqual(address2, expected)
 
+        init_code_hash = self.w3.keccak(init_code)
+        self.assertEqual(generate_address_2_from_init_code_hash(from_, salt, init_code_hash), expected)
+        with self.assertRaises(AssertionError):
+            generate_address_2_from_init_code_hash(from_, salt, init_code)
+
     def test_generate_address2_with_proxy(self):
         deployer_account = self.ethereum_test_account
         proxy_factory_contract = get_proxy_factory_contract(self.w3)
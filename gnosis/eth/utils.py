@@ -1,11 +1,13 @@
 import os
-from typing import Tuple, Union
+from typing import Iterable, Sequence, Tuple, TypeVar, Union
 
 import eth_abi
 from ethereum import utils
 from hexbytes import HexBytes
 from web3 import Web3
 
+T = TypeVar('T')
+
 
 def get_eth_address_with_key() -> Tuple[str, bytes]:
     # import secp256k1
@@ -40,7 +42,27 @@ def generate_address_2(from_: Union[str, bytes], salt: Union[str, bytes], init_c
     assert len(salt) == 32, "Salt %s is not valid. Must be 32 bytes" % salt
     assert len(init_code) > 0, "Init code %s is not valid" % init_code
 
-    init_code_hash = Web3.keccak(init_code)
+    return generate_address_2_from_init_code_hash(from_, salt, Web3.keccak(init_code))
+
+
+def generate_address_2_from_init_code_hash(from_: Union[str, bytes], salt: Union[str, bytes],
+                                           init_code_hash: Union[str, bytes]) -> str:
+    """
+    Generates an address for a contract created using CREATE2, when the keccak of the init code is already known.
+    :param from_: The address which is creating this new address (need to be 20 bytes)
+    :param salt: A salt (32 bytes)
+    :param init_code_hash: keccak256 of the init code of the contract being created (32 bytes)
+    :return: Address of the new contract
+    """
+
+    from_ = HexBytes(from_)
+    salt = HexBytes(salt)
+    init_code_hash = HexBytes(init_code_hash)
+
+    assert len(from_) == 20, "Address %s is not valid. Must be 20 bytes" % from_
+    assert len(salt) == 32, "Salt %s is not valid. Must be 32 bytes" % salt
+    assert len(init_code_hash) == 32, "Init code hash %s is not valid. Must be 32 bytes" % init_code_hash
+
     contract_address = Web3.keccak(HexBytes('ff') + from_ + salt + init_code_hash)
     return Web3.toChecksumAddress(contract_address[12:])
 
@@ -88,3 +110,13 @@ def compare_byte_code(code_1: bytes, code_2: bytes) -> bool:
                 codes.append(code)
 
         return codes[0] == codes[1]
+
+
+def chunks(elements: Sequence[T], n: int) -> Iterable[Sequence[T]]:
+    """
+    :param elements: Sequence to split
+    :param n: Number of elements per chunk
+    :return: Successive n-sized chunks from elements
+    """
+    for i in range(0, len(elements), n):
+        yield elements[i:i + n]
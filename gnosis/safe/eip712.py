@@ -0,0 +1,71 @@
+"""
+EIP712 hashes for the fixed Safe schemas (`SafeTx` and `SafeMessage`), calculated directly with keccak instead
+of processing the generic typed data structure. Type hashes are precomputed and domain separators are cached
+for every Safe
+"""
+from functools import lru_cache
+
+from eth_utils import keccak
+from hexbytes import HexBytes
+from packaging.version import Version
+
+DOMAIN_TYPEHASH = keccak(text='EIP712Domain(address verifyingContract)')
+SAFE_TX_TYPEHASH = keccak(text='SafeTx(address to,uint256 value,bytes data,uint8 operation,uint256 safeTxGas,'
+                               'uint256 baseGas,uint256 gasPrice,address gasToken,address refundReceiver,'
+                               'uint256 nonce)')
+# Safes < 1.0.0 use `dataGas` instead of `baseGas`
+SAFE_TX_TYPEHASH_V0 = keccak(text='SafeTx(address to,uint256 value,bytes data,uint8 operation,uint256 safeTxGas,'
+                                  'uint256 dataGas,uint256 gasPrice,address gasToken,address refundReceiver,'
+                                  'uint256 nonce)')
+SAFE_MESSAGE_TYPEHASH = keccak(text='SafeMessage(bytes message)')
+
+
+def _encode_address(address: str) -> bytes:
+    address_bytes = HexBytes(address)
+    if len(address_bytes) != 20:
+        raise ValueError('%s is not a valid address' % address)
+    return b'\0' * 12 + address_bytes
+
+
+def _encode_uint(value: int) -> bytes:
+    return value.to_bytes(32, byteorder='big')
+
+
+@lru_cache(maxsize=None)
+def get_safe_tx_typehash(safe_version: str) -> bytes:
+    return SAFE_TX_TYPEHASH if Version(safe_version) >= Version('1.0.0') else SAFE_TX_TYPEHASH_V0
+
+
+@lru_cache(maxsize=1024)
+def get_domain_separator(safe_address: str) -> bytes:
+    return keccak(DOMAIN_TYPEHASH + _encode_address(safe_address))
+
+
+def get_safe_tx_hash(safe_address: str, to: str, value: int, data: bytes, operation: int, safe_tx_gas: int,
+                     base_gas: int, gas_price: int, gas_token: str, refund_receiver: str, nonce: int,
+                     safe_version: str = '1.0.0') -> HexBytes:
+    """
+    :return: Same EIP712 hash as the Safe contract `getTransactionHash`
+    """
+    struct_hash = keccak(b''.join((
+        get_safe_tx_typehash(safe_version),
+        _encode_address(to),
+        _encode_uint(value),
+        keccak(data or b''),
+        _encode_uint(operation),
+        _encode_uint(safe_tx_gas),
+        _encode_uint(base_gas),
+        _encode_uint(gas_price),
+        _encode_address(gas_token),
+        _encode_address(refund_receiver),
+        _encode_uint(nonce),
+    )))
+    return HexBytes(keccak(b'\x19\x01' + get_domain_separator(safe_address) + struct_hash))
+
+
+def get_safe_message_hash(safe_address: str, message: bytes) -> HexBytes:
+    """
+    :return: Same EIP712 hash as the Safe contract `getMessageHash`
+    """
+    struct_hash = keccak(SAFE_MESSAGE_TYPEHASH + keccak(message))
+    return HexBytes(keccak(b'\x19\x01' + get_domain_separator(safe_address) + struct_hash))
@@ -68,3 +68,11 @@ class OwnerManagerException(InvalidMultisigTx):
 
 class ModuleManagerException(InvalidMultisigTx):
     pass
+
+
+class CannotRetrieveSafeInfo(SafeServiceException):
+    pass
+
+
+class MultiSendTxGasTooHigh(SafeServiceException):
+    pass
@@ -1,6 +1,6 @@
 from enum import Enum
 from logging import getLogger
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Union
 
 from eth_account.signers.local import LocalAccount
 from hexbytes import HexBytes
@@ -34,23 +34,64 @@ class MultiSendTx:
 
     @classmethod
     def from_bytes(cls, encoded_multisend_tx: bytes):
-        operation = MultiSendOperation(encoded_multisend_tx[0])
-        address = Web3.toChecksumAddress(encoded_multisend_tx[1:1 + 20])
-        value = int.from_bytes(encoded_multisend_tx[21:21 + 32], byteorder='big')
-        # data_lenght = int.from_bytes(encoded_multisend_tx[21 + 32: 21 + 32 * 2], byteorder='big)
-        data = encoded_multisend_tx[21 + 32 * 2:]
-        return cls(operation, address, value, data)
+        multi_send_tx, _ = cls._decode(memoryview(encoded_multisend_tx), 0)
+        return multi_send_tx
+
+    @classmethod
+    def _decode(cls, encoded_multisend_txs: memoryview, offset: int,
+                copy_data: bool = True) -> Tuple['MultiSendTx', int]:
+        """
+        :param encoded_multisend_txs: Packed MultiSend txs
+        :param offset: Position of the tx to decode
+        :param copy_data: If `False`, `data` will be a `memoryview` of `encoded_multisend_txs`
+        :return: Tuple with the MultiSendTx and the position of the next tx
+        :raises: ValueError: If tx is not valid
+        """
+        data_offset = offset + 1 + 20 + 32 * 2
+        if len(encoded_multisend_txs) < data_offset:
+            raise ValueError('Not enough bytes to decode MultiSend tx at position %d' % offset)
+        operation = MultiSendOperation(encoded_multisend_txs[offset])
+        address = Web3.toChecksumAddress(bytes(encoded_multisend_txs[offset + 1:offset + 1 + 20]))
+        value = int.from_bytes(encoded_multisend_txs[offset + 21:offset + 21 + 32], byteorder='big')
+        data_length = int.from_bytes(encoded_multisend_txs[offset + 21 + 32:data_offset], byteorder='big')
+        next_offset = data_offset + data_length
+        if len(encoded_multisend_txs) < next_offset:
+            raise ValueError('Data length %d of MultiSend tx at position %d is not valid' % (data_length, offset))
+        data = encoded_multisend_txs[data_offset:next_offset]
+        return cls(operation, address, value, HexBytes(data) if copy_data else data), next_offset
+
+    # Operation 1 byte, address 20 bytes, value 32 bytes and data length 32 bytes
+    HEADER_SIZE = 1 + 20 + 32 + 32
+
+    @property
+    def encoded_size(self) -> int:
+        return self.HEADER_SIZE + len(self.data)
+
+    def _encode_into(self, buffer: bytearray, offset: int) -> int:
+        """
+        Write the packed tx into `buffer`
+        :param buffer: Buffer with at least `encoded_size` bytes from `offset`
+        :param offset:
+        :return: Position after the tx
+        """
+        data_length = len(self.data)
+        buffer[offset] = self.operation.value
+        buffer[offset + 1:offset + 21] = int(self.address, 16).to_bytes(20, byteorder='big')
+        buffer[offset + 21:offset + 53] = self.value.to_bytes(32, byteorder='big')
+        buffer[offset + 53:offset + 85] = data_length.to_bytes(32, byteorder='big')
+        buffer[offset + 85:offset + 85 + data_length] = self.data
+        return offset + 85 + data_length
 
     @property
     def encoded_data(self):
-        multisend_operation = HexBytes('{:0>2x}'.format(self.operation.value))  # Operation 1 byte
-        multisend_address = HexBytes('{:0>40x}'.format(int(self.address, 16)))  # Address 20 bytes
-        multisend_value = HexBytes('{:0>64x}'.format(self.value))  # Value 32 bytes
-        data_lenght = HexBytes('{:0>64x}'.format(len(self.data)))  # Data length 32 bytes
-        return multisend_operation + multisend_address + multisend_value + data_lenght + self.data
+        buffer = bytearray(self.encoded_size)
+        self._encode_into(buffer, 0)
+        return HexBytes(buffer)
 
 
 class MultiSend:
+    MULTI_SEND_SELECTOR = HexBytes('0x8d80ff0a')  # keccak('multiSend(bytes)')[:4]
+
     def __init__(self, address: str, ethereum_client: EthereumClient):
         assert Web3.isChecksumAddress(address), \
             '%s proxy factory address not valid' % address
@@ -88,7 +129,91 @@ class MultiSend:
         :param sender:
         :return:
         """
-        multisig_contract = self.get_contract()
-        encoded_multisend_data = b''.join([x.encoded_data for x in multi_send_txs])
-        return multisig_contract.functions.multiSend(encoded_multisend_data).buildTransaction({'gas': 1,
-                                                                                               'gasPrice': 1})['data']
+        return self.encode_multisend_tx_data(multi_send_txs)
+
+    @staticmethod
+    def encode_multisend_data(multi_send_txs: Sequence[MultiSendTx]) -> bytes:
+        """
+        :param multi_send_txs:
+        :return: Packed txs, the `bytes` parameter of `multiSend`. Txs are written to one preallocated buffer
+        """
+        buffer = bytearray(sum(multi_send_tx.encoded_size for multi_send_tx in multi_send_txs))
+        offset = 0
+        for multi_send_tx in multi_send_txs:
+            offset = multi_send_tx._encode_into(buffer, offset)
+        return bytes(buffer)
+
+    @classmethod
+    def encode_multisend_tx_data(cls, multi_send_txs: Sequence[MultiSendTx]) -> HexBytes:
+        """
+        Same as `encode_contract_function('multi_send', 'multiSend', [encode_multisend_data(multi_send_txs)])`,
+        but txs are written directly to the preallocated calldata buffer
+        :param multi_send_txs:
+        :return: `multiSend(bytes)` calldata
+        """
+        data_length = sum(multi_send_tx.encoded_size for multi_send_tx in multi_send_txs)
+        # Selector, offset of `bytes`, length of `bytes` and data padded to 32 bytes
+        header_size = 4 + 32 + 32
+        buffer = bytearray(header_size + -(-data_length // 32) * 32)
+        buffer[:4] = cls.MULTI_SEND_SELECTOR
+        buffer[4:36] = (32).to_bytes(32, byteorder='big')
+        buffer[36:68] = data_length.to_bytes(32, byteorder='big')
+        offset = header_size
+        for multi_send_tx in multi_send_txs:
+            offset = multi_send_tx._encode_into(buffer, offset)
+        return HexBytes(buffer)
+
+    @classmethod
+    def _get_encoded_multisend_data(cls, data: memoryview) -> memoryview:
+        """
+        :param data: `multiSend(bytes)` calldata
+        :return: ABI decoded `bytes` parameter, as a `memoryview` of `data`
+        :raises: ValueError: If data is not valid
+        """
+        if bytes(data[:4]) != cls.MULTI_SEND_SELECTOR:
+            raise ValueError('Data is not a multiSend call')
+        bytes_offset = 4 + int.from_bytes(data[4:4 + 32], byteorder='big')
+        bytes_length = int.from_bytes(data[bytes_offset:bytes_offset + 32], byteorder='big')
+        if len(data) < 4 + 32 * 2 or len(data) < bytes_offset + 32 + bytes_length:
+            raise ValueError('Not valid multiSend data')
+        return data[bytes_offset + 32:bytes_offset + 32 + bytes_length]
+
+    @classmethod
+    def decode_multisend_data(cls, encoded_multisend_data: Union[bytes, memoryview], nested: bool = True,
+                              copy_data: bool = True) -> Iterator[MultiSendTx]:
+        """
+        Decode the packed txs of a MultiSend (the `bytes` parameter of `multiSend`). Txs are decoded lazily
+        :param encoded_multisend_data:
+        :param nested: If `True`, `DELEGATE_CALL` txs with `multiSend` data are replaced by their inner txs
+        :param copy_data: If `False`, `data` of every tx will be a `memoryview` of `encoded_multisend_data`, so
+        big data is not copied
+        :return: Iterator of MultiSendTx
+        :raises: ValueError: If data is not valid
+        """
+        encoded_multisend_data = memoryview(encoded_multisend_data)
+        offset = 0
+        while offset < len(encoded_multisend_data):
+            multi_send_tx, offset = MultiSendTx._decode(encoded_multisend_data, offset, copy_data=False)
+            if (nested and multi_send_tx.operation == MultiSendOperation.DELEGATE_CALL
+                    and bytes(multi_send_tx.data[:4]) == cls.MULTI_SEND_SELECTOR):
+                yield from cls.from_transaction_data(multi_send_tx.data, nested=nested, copy_data=copy_data)
+            else:
+                if copy_data:
+                    multi_send_tx.data = HexBytes(multi_send_tx.data)
+                yield multi_send_tx
+
+    @classmethod
+    def from_transaction_data(cls, data: Union[bytes, str, memoryview], nested: bool = True,
+                              copy_data: bool = True) -> Iterator[MultiSendTx]:
+        """
+        Same as `decode_multisend_data`, but using the whole `multiSend(bytes)` calldata
+        :param data: Calldata of the tx to the MultiSend contract
+        :param nested:
+        :param copy_data:
+        :return: Iterator of MultiSendTx
+        :raises: ValueError: If data is not valid
+        """
+        if isinstance(data, str):
+            data = HexBytes(data)
+        return cls.decode_multisend_data(cls._get_encoded_multisend_data(memoryview(data)), nested=nested,
+                                         copy_data=copy_data)
@@ -0,0 +1,137 @@
+from logging import getLogger
+from typing import List, Optional, Sequence, Tuple
+
+from gnosis.eth.constants import NULL_ADDRESS
+
+from .exceptions import MultiSendTxGasTooHigh
+from .multi_send import MultiSend, MultiSendTx
+from .safe import Safe, SafeOperation
+from .safe_tx import SafeTx
+
+logger = getLogger(__name__)
+
+
+class MultiSendPlanner:
+    """
+    Split a lot of MultiSend txs in batches executed through a Safe. Txs are packed greedily (keeping the order)
+    using a gas model: calldata gas of every encoded tx (`EthereumClient.estimate_data_gas`) plus
+    `gas_per_tx` for its execution. Then gas for every batch (`safe_tx_gas` + `base_gas`) is estimated
+    concurrently, and batches not fitting on the maximum batch gas are split again
+    """
+    def __init__(self, safe: Safe, multi_send: MultiSend, gas_budget: Optional[int] = None,
+                 gas_per_tx: int = 50000, block_gas_limit_ratio: float = 0.8):
+        """
+        :param safe: Safe executing the txs
+        :param multi_send: MultiSend contract used by the Safe with `DELEGATE_CALL`
+        :param gas_budget: Target gas for every batch. If not provided, only the block gas limit is used
+        :param gas_per_tx: Execution gas expected for every MultiSend tx (e.g. an ERC20 transfer)
+        :param block_gas_limit_ratio: Maximum fraction of the block gas limit used by every batch
+        """
+        self.safe = safe
+        self.multi_send = multi_send
+        self.ethereum_client = safe.ethereum_client
+        self.gas_budget = gas_budget
+        self.gas_per_tx = gas_per_tx
+        self.block_gas_limit_ratio = block_gas_limit_ratio
+
+    def get_max_batch_gas(self) -> int:
+        """
+        :return: Maximum gas for every batch, using `gas_budget` and the block gas limit
+        """
+        max_batch_gas = int(self.ethereum_client.w3.eth.getBlock('latest')['gasLimit'] * self.block_gas_limit_ratio)
+        return min(self.gas_budget, max_batch_gas) if self.gas_budget else max_batch_gas
+
+    def estimate_multi_send_tx_gas(self, multi_send_tx: MultiSendTx) -> int:
+        """
+        :return: Gas expected for the tx inside a batch using the gas model
+        """
+        return self.ethereum_client.estimate_data_gas(multi_send_tx.encoded_data) + self.gas_per_tx
+
+    def pack(self, multi_send_txs: Sequence[MultiSendTx], max_batch_gas: int) -> List[List[MultiSendTx]]:
+        """
+        :param multi_send_txs:
+        :param max_batch_gas:
+        :return: Batches of txs, in the same order. A tx exceeding `max_batch_gas` on its own gets its own batch
+        """
+        batches: List[List[MultiSendTx]] = []
+        batch: List[MultiSendTx] = []
+        batch_gas = 0
+        for multi_send_tx in multi_send_txs:
+            tx_gas = self.estimate_multi_send_tx_gas(multi_send_tx)
+            if batch and batch_gas + tx_gas > max_batch_gas:
+                batches.append(batch)
+                batch, batch_gas = [], 0
+            batch.append(multi_send_tx)
+            batch_gas += tx_gas
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def plan(self, multi_send_txs: Sequence[MultiSendTx], gas_price: int = 0, gas_token: str = NULL_ADDRESS,
+             refund_receiver: str = NULL_ADDRESS, safe_nonce: Optional[int] = None) -> List[SafeTx]:
+        """
+        :param multi_send_txs:
+        :param gas_price: Gas price for the refund of every SafeTx
+        :param gas_token: Gas token for the refund of every SafeTx
+        :param refund_receiver: Refund receiver of every SafeTx
+        :param safe_nonce: Nonce of the first SafeTx. If not provided, current nonce of the Safe
+        :return: Unsigned SafeTx for every batch, with `safe_tx_gas` and `base_gas` estimated and consecutive nonces.
+        `safe_tx_gas` + `base_gas` is never higher than the maximum batch gas
+        :raises: CannotEstimateGas: If gas cannot be estimated for a batch
+        :raises: MultiSendTxGasTooHigh: If one tx needs more than the maximum batch gas on its own
+        """
+        if not multi_send_txs:
+            return []
+
+        max_batch_gas = self.get_max_batch_gas()
+        threshold = self.safe.retrieve_threshold()
+        safe_nonce = self.safe.retrieve_nonce() if safe_nonce is None else safe_nonce
+        safe_version = self.safe.retrieve_version()
+        to = self.multi_send.address
+        operation = SafeOperation.DELEGATE_CALL.value
+
+        def estimate_batch(batch: List[MultiSendTx]) -> Tuple[int, int]:
+            data = MultiSend.encode_multisend_tx_data(batch)
+            safe_tx_gas = self.safe.estimate_tx_gas(to, 0, data, operation)
+            # `base_gas` is recalculated later with the nonce of the batch, it can only be lower
+            base_gas = self.safe.estimate_tx_base_gas(to, 0, data, operation, gas_token, safe_tx_gas,
+                                                      threshold=threshold, nonce=safe_nonce)
+            return safe_tx_gas, base_gas
+
+        # Batches (with the position of their first tx) and their estimated `safe_tx_gas`. Batches needing more
+        # gas than expected by the gas model are split in halves and estimated again
+        pending_batches = []
+        position = 0
+        for batch in self.pack(multi_send_txs, max_batch_gas):
+            pending_batches.append((position, batch))
+            position += len(batch)
+        estimated_batches = []
+        while pending_batches:
+            gas_estimations = self.ethereum_client.batch_request_executor.map(
+                estimate_batch, [batch for _, batch in pending_batches]
+            )
+            next_pending_batches = []
+            for (position, batch), (safe_tx_gas, base_gas) in zip(pending_batches, gas_estimations):
+                if safe_tx_gas + base_gas <= max_batch_gas:
+                    estimated_batches.append((position, batch, safe_tx_gas))
+                elif len(batch) > 1:
+                    logger.info('Batch with %d txs needs %d gas, more than the maximum %d. Splitting it',
+                                len(batch), safe_tx_gas + base_gas, max_batch_gas)
+                    half = len(batch) // 2
+                    next_pending_batches.extend(((position, batch[:half]), (position + half, batch[half:])))
+                else:
+                    raise MultiSendTxGasTooHigh('MultiSend tx in position %d needs %d gas, more than the maximum '
+                                                '%d' % (position, safe_tx_gas + base_gas, max_batch_gas))
+            pending_batches = next_pending_batches
+        estimated_batches.sort(key=lambda estimated_batch: estimated_batch[0])
+
+        safe_txs = []
+        for nonce, (_, batch, safe_tx_gas) in enumerate(estimated_batches, start=safe_nonce):
+            data = MultiSend.encode_multisend_tx_data(batch)
+            base_gas = self.safe.estimate_tx_base_gas(to, 0, data, operation, gas_token, safe_tx_gas,
+                                                      threshold=threshold, nonce=nonce)
+            safe_txs.append(self.safe.build_multisig_tx(to, 0, data, operation=operation, safe_tx_gas=safe_tx_gas,
+                                                        base_gas=base_gas, gas_price=gas_price,
+                                                        gas_token=gas_token, refund_receiver=refund_receiver,
+                                                        safe_nonce=nonce, safe_version=safe_version))
+        return safe_txs
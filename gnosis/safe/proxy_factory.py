@@ -1,23 +1,39 @@
 from logging import getLogger
-from typing import Optional
+from typing import FrozenSet, List, Optional, Sequence
 
 from eth_account.signers.local import LocalAccount
+from hexbytes import HexBytes
 from web3 import Web3
 from web3.contract import Contract
 
 from gnosis.eth import EthereumClient
+from gnosis.eth.cache import BaseCache, LRUCache
 from gnosis.eth.contracts import (get_paying_proxy_deployed_bytecode,
                                   get_proxy_1_0_0_deployed_bytecode,
                                   get_proxy_factory_V1_0_0_contract)
 from gnosis.eth.ethereum_client import EthereumTxSent
 from gnosis.eth.constants import NULL_ADDRESS
-from gnosis.eth.utils import compare_byte_code
+from gnosis.eth.utils import remove_swarm_metadata
 
 logger = getLogger(__name__)
 
 
+def _get_code_hash(code: bytes) -> bytes:
+    """
+    :param code:
+    :return: Keccak of the code without swarm metadata, so codes can be compared
+    """
+    try:
+        code = remove_swarm_metadata(code)
+    except ValueError:
+        pass
+    return Web3.keccak(code)
+
+
 class ProxyFactory:
-    proxy_runtime_code: Optional[bytes] = None  # Cache runtime code
+    # Runtime code for every network and proxy factory address, shared by every `ProxyFactory` instance
+    proxy_runtime_codes: BaseCache = LRUCache(maxsize=1024)
+    _valid_proxy_code_hashes: Optional[FrozenSet[bytes]] = None  # Hashes of the supported deployed bytecodes
 
     def __init__(self, address: str, ethereum_client: EthereumClient):
         assert Web3.isChecksumAddress(address), \
@@ -26,6 +42,7 @@ class ProxyFactory:
         self.address = address
         self.ethereum_client = ethereum_client
         self.w3 = ethereum_client.w3
+        self._network_id: Optional[int] = None
 
     @staticmethod
     def _deploy_proxy_factory_contract(ethereum_client: EthereumClient,
@@ -64,21 +81,44 @@ class ProxyFactory:
         proxy_factory_contract = get_proxy_factory_V1_0_0_contract(ethereum_client.w3)
         return cls._deploy_proxy_factory_contract(ethereum_client, deployer_account, proxy_factory_contract)
 
+    @classmethod
+    def _get_valid_proxy_code_hashes(cls) -> FrozenSet[bytes]:
+        """
+        :return: Hashes of the deployed bytecodes of the supported proxies, check `_get_code_hash`
+        """
+        if cls._valid_proxy_code_hashes is None:
+            ProxyFactory._valid_proxy_code_hashes = frozenset(_get_code_hash(code)
+                                                              for code in (get_paying_proxy_deployed_bytecode(),
+                                                                           get_proxy_1_0_0_deployed_bytecode()))
+        return cls._valid_proxy_code_hashes
+
     def check_proxy_code(self, address: str) -> bool:
         """
         Check if proxy is valid
         :param address: Ethereum address to check
         :return: True if proxy is valid, False otherwise
         """
+        deployed_proxy_code_hash = _get_code_hash(self.w3.eth.getCode(address))
+        return (deployed_proxy_code_hash in self._get_valid_proxy_code_hashes()
+                or deployed_proxy_code_hash == _get_code_hash(self.get_proxy_runtime_code()))
 
-        deployed_proxy_code = self.w3.eth.getCode(address)
-        proxy_code_fns = (get_paying_proxy_deployed_bytecode,
-                          get_proxy_1_0_0_deployed_bytecode,
-                          self.get_proxy_runtime_code)
-        for proxy_code_fn in proxy_code_fns:
-            if compare_byte_code(deployed_proxy_code, proxy_code_fn()):
-                return True
-        return False
+    def check_proxy_codes(self, addresses: Sequence[str], batch_size: Optional[int] = None) -> List[Optional[bool]]:
+        """
+        Check if proxies are valid. Codes are retrieved using JSON-RPC batches
+        :param addresses: Ethereum addresses to check
+        :param batch_size: Maximum number of `eth_getCode` queries per batch. If not provided, client default
+        :return: List with `True` if proxy is valid, `False` otherwise or `None` if code could not be retrieved
+        for every address, in the same order
+        """
+        if not addresses:
+            return []
+        valid_proxy_code_hashes = self._get_valid_proxy_code_hashes() | {
+            _get_code_hash(self.get_proxy_runtime_code())
+        }
+        payload = [{'jsonrpc': '2.0', 'method': 'eth_getCode', 'params': [address, 'latest']}
+                   for address in addresses]
+        return [_get_code_hash(HexBytes(result['result'])) in valid_proxy_code_hashes if 'result' in result else None
+                for result in self.ethereum_client.iter_raw_batch_request(payload, batch_size=batch_size)]
 
     def deploy_proxy_contract(self, deployer_account: LocalAccount, master_copy: str, initializer: bytes = b'',
                               gas: Optional[int] = None, gas_price: Optional[int] = None) -> EthereumTxSent:
@@ -195,7 +235,15 @@ class ProxyFactory:
     def get_contract(self):
         return get_proxy_factory_V1_0_0_contract(self.ethereum_client.w3, self.address)
 
-    def get_proxy_runtime_code(self):
-        if not self.proxy_runtime_code:
-            self.proxy_runtime_code = self.get_contract().functions.proxyRuntimeCode().call()
-        return self.proxy_runtime_code
+    def get_proxy_runtime_code(self) -> bytes:
+        """
+        :return: Runtime code of the proxies deployed by the factory. It's cached, as it cannot change
+        """
+        if self._network_id is None:
+            self._network_id = int(self.w3.net.version)
+        key = f'proxy_runtime_code:{self._network_id}:{self.address}'
+        proxy_runtime_code = self.proxy_runtime_codes.get(key)
+        if not proxy_runtime_code:
+            proxy_runtime_code = self.get_contract().functions.proxyRuntimeCode().call()
+            self.proxy_runtime_codes.set(key, proxy_runtime_code)
+        return proxy_runtime_code
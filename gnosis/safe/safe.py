@@ -1,27 +1,42 @@
 from enum import Enum
 from logging import getLogger
-from typing import List, NamedTuple, Optional
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.exceptions import DecodingError
+from eth_abi.registry import registry
 from eth_account import Account
 from eth_account.signers.local import LocalAccount
 from hexbytes import HexBytes
 from web3 import Web3
 
 from gnosis.eth.constants import GAS_CALL_DATA_BYTE, NULL_ADDRESS
-from gnosis.eth.contracts import (get_delegate_constructor_proxy_contract,
+from gnosis.eth.contracts import (encode_contract_function,
+                                  get_delegate_constructor_proxy_contract,
                                   get_safe_contract, get_safe_V0_0_1_contract,
                                   get_safe_V1_0_0_contract)
 from gnosis.eth.ethereum_client import EthereumClient, EthereumTxSent
 from gnosis.eth.utils import get_eth_address_with_key
 from gnosis.safe.proxy_factory import ProxyFactory
 
-from .exceptions import CannotEstimateGas, InvalidPaymentToken
+from .exceptions import (CannotEstimateGas, CannotRetrieveSafeInfo,
+                         InvalidPaymentToken)
 from .safe_create2_tx import SafeCreate2Tx, SafeCreate2TxBuilder
 from .safe_creation_tx import InvalidERC20Token, SafeCreationTx
+from .safe_state_cache import SafeStateCache, resolve_block_number
 from .safe_tx import SafeTx
 
 logger = getLogger(__name__)
 
+# ABI decoders are built once, `eth_abi.decode_abi` builds them again for every call
+_UINT256_DECODER = TupleDecoder(decoders=[registry.get_decoder('uint256')])
+_ADDRESS_ARRAY_DECODER = TupleDecoder(decoders=[registry.get_decoder('address[]')])
+_STRING_DECODER = TupleDecoder(decoders=[registry.get_decoder('string')])
+
+
+def _decode_single(decoder: TupleDecoder, data: bytes) -> Any:
+    return decoder(ContextFramesBytesIO(data))[0]
+
 
 class SafeCreationEstimate(NamedTuple):
     gas: int
@@ -30,6 +45,31 @@ class SafeCreationEstimate(NamedTuple):
     payment_token: Optional[str]
 
 
+class SafeInfo(NamedTuple):
+    address: str
+    block_number: int
+    master_copy: str
+    nonce: int
+    threshold: int
+    owners: Tuple[str, ...]
+    version: str
+    fallback_handler: str
+
+
+class SafeTxEstimation(NamedTuple):
+    safe_tx_gas: int
+    base_gas: int
+    gas_token: str
+    gas_token_balance: int
+
+    def has_enough_funds(self, gas_price: int) -> bool:
+        """
+        :param gas_price: Gas price, in `gas_token`
+        :return: `True` if Safe has enough funds to pay for the tx, `False` otherwise
+        """
+        return self.gas_token_balance >= (self.safe_tx_gas + self.base_gas) * gas_price
+
+
 class SafeOperation(Enum):
     CALL = 0
     DELEGATE_CALL = 1
@@ -38,13 +78,24 @@ class SafeOperation(Enum):
 
 class Safe:
     FALLBACK_HANDLER_STORAGE_SLOT = '0x6c9a6c4a39284e37ed1cf53d337577d14212a4870fb976a4366c693b939918d5'
+    NONCE_SELECTOR = '0xaffed0e0'  # keccak('nonce()')[:4]
+    GET_THRESHOLD_SELECTOR = '0xe75235b8'  # keccak('getThreshold()')[:4]
+    GET_OWNERS_SELECTOR = '0xa0e67e2b'  # keccak('getOwners()')[:4]
+    VERSION_SELECTOR = '0xffa1ad74'  # keccak('VERSION()')[:4]
 
-    def __init__(self, address: str, ethereum_client: EthereumClient):
+    def __init__(self, address: str, ethereum_client: EthereumClient, state_cache: Optional[SafeStateCache] = None):
+        """
+        :param address: Safe address
+        :param ethereum_client:
+        :param state_cache: If provided, `retrieve_*` results will be cached for every block. It can be shared
+        between `Safe` instances
+        """
         assert Web3.isChecksumAddress(address), '%s is not a valid address' % address
 
         self.ethereum_client = ethereum_client
         self.w3 = self.ethereum_client.w3
         self.address = address
+        self.state_cache = state_cache
 
     @staticmethod
     def create(ethereum_client: EthereumClient, deployer_account: LocalAccount,
@@ -66,7 +117,7 @@ class Safe:
         assert owners, 'At least one owner must be set'
         assert threshold >= len(owners), 'Threshold=%d must be >= %d' % (threshold, len(owners))
 
-        initializer = get_safe_contract(ethereum_client.w3, NULL_ADDRESS).functions.setup(
+        initializer = encode_contract_function('safe', 'setup', [
             owners,
             threshold,
             NULL_ADDRESS,  # Contract address for optional delegate call
@@ -75,7 +126,7 @@ class Safe:
             payment_token,
             payment,
             payment_receiver
-        ).buildTransaction({'gas': 1, 'gasPrice': 1})['data']
+        ])
 
         if proxy_factory_address:
             proxy_factory = ProxyFactory(proxy_factory_address, ethereum_client)
@@ -296,7 +347,8 @@ class Safe:
         return balance >= (safe_tx_gas + base_gas) * gas_price
 
     def estimate_tx_base_gas(self, to: str, value: int, data: bytes,
-                             operation: int, gas_token: str, estimate_tx_gas: int) -> int:
+                             operation: int, gas_token: str, estimate_tx_gas: int,
+                             threshold: Optional[int] = None, nonce: Optional[int] = None) -> int:
         """
         Calculate gas costs that are independent of the transaction execution(e.g. base transaction fee,
         signature check, payment of the refund...)
@@ -306,12 +358,13 @@ class Safe:
         :param operation:
         :param gas_token:
         :param estimate_tx_gas: gas calculated with `estimate_tx_gas`
+        :param threshold: Threshold of the Safe. If not provided, it will be retrieved
+        :param nonce: Nonce of the Safe. If not provided, it will be retrieved
         :return:
         """
         data = data or b''
-        safe_contract = self.get_contract()
-        threshold = self.retrieve_threshold()
-        nonce = self.retrieve_nonce()
+        threshold = self.retrieve_threshold() if threshold is None else threshold
+        nonce = self.retrieve_nonce() if nonce is None else nonce
 
         # Every byte == 0 -> 4  Gas
         # Every byte != 0 -> 16 Gas (68 before Istanbul)
@@ -330,7 +383,7 @@ class Safe:
         gas_token = gas_token or NULL_ADDRESS
         signatures = b''
         refund_receiver = NULL_ADDRESS
-        data = HexBytes(safe_contract.functions.execTransaction(
+        data = encode_contract_function('safe', 'execTransaction', [
             to,
             value,
             data,
@@ -341,10 +394,7 @@ class Safe:
             gas_token,
             refund_receiver,
             signatures,
-        ).buildTransaction({
-            'gas': 1,
-            'gasPrice': 1
-        })['data'])
+        ])
 
         # If nonce == 0, nonce storage has to be initialized
         if nonce == 0:
@@ -396,16 +446,13 @@ class Safe:
 
         # Add 10k, else we will fail in case of nested calls
         try:
-            tx = self.get_contract().functions.requiredTxGas(
-                to,
-                value,
-                data,
-                operation
-            ).buildTransaction({
+            tx = {
                 'from': safe_address,
+                'to': safe_address,
+                'data': encode_contract_function('safe', 'requiredTxGas', [to, value, data, operation]),
                 'gas': int(1e7),
                 'gasPrice': 0,
-            })
+            }
             # If we build the tx Web3 will not try to decode it for us
             # Ganache >= 6.3.0 and Geth are working like this
             result: HexBytes = self.w3.eth.call(tx, block_identifier=block_identifier)
@@ -440,28 +487,66 @@ class Safe:
                 estimated_gas = int(estimated_gas_hex, 16)
                 return estimated_gas
 
-    def estimate_tx_gas_with_web3(self, to: str, value: int, data: bytes) -> int:
+    def _build_estimate_tx_gas_probes_payload(self, to: str, value: int, data: bytes, gas_probes: List[int],
+                                              block_identifier: str) -> List[Dict[str, Any]]:
         """
-        Estimate tx gas using web3
+        :return: JSON-RPC `eth_call` queries for the tx, one for every gas limit in `gas_probes`
         """
-        gas_estimated = self.ethereum_client.estimate_gas(self.address, to, value, data)
-        for _ in range(20):  # Test `call()` and increase gas 20 times, 63/64th problem
-            try:
-                self.w3.eth.call({'gas': gas_estimated, 'from': self.address,
-                                  'to': to, 'value': value,
-                                  'data': data or b''})
-                return gas_estimated
-            except ValueError:  # Out of gas
-                # Parity: ValueError: {'code': -32015, 'message': 'Transaction execution error.', 'data': 'NotEnoughBaseGas { required: 21632, got: 16935 }'}
-                # Geth: ValueError: {'code': -32000, 'message': 'out of gas'}
-                gas_estimated += 10000
-        return gas_estimated
+        tx = {'from': self.address, 'to': to, 'value': hex(value), 'data': HexBytes(data or b'').hex()}
+        return [{'jsonrpc': '2.0', 'method': 'eth_call',
+                 'params': [dict(tx, gas=hex(gas)), block_identifier], 'id': i}
+                for i, gas in enumerate(gas_probes)]
 
-    def estimate_tx_gas(self, to: str, value: int, data: bytes, operation: int) -> int:
+    def estimate_tx_gas_with_web3(self, to: str, value: int, data: bytes, precision: int = 10000,
+                                  probes_per_round: int = 8) -> int:
         """
-        Estimate tx gas. Use the max of calculation using safe method and web3 if operation == CALL or
-        use just the safe calculation otherwise
+        Estimate tx gas using web3. As the node estimation can be too low for nested calls (63/64th problem),
+        gas limits above it are tested with `eth_call`: first growing exponentially from the estimation, and
+        then with a binary search (split in `probes_per_round` parts) between the highest gas limit failing
+        and the lowest one working. Every round of probes is sent in one JSON-RPC batch, directly from the
+        calling thread (not using the `batch_request_executor`), so it can be used from tasks running on it
+        :param precision: Maximum difference between the returned gas and the minimum gas needed
+        :param probes_per_round: Number of `eth_call` sent on every round
+        :return: Lowest gas limit found for the tx to work, never higher than the block gas limit
         """
+        gas_estimated = self.ethereum_client.estimate_gas(self.address, to, value, data)
+        block = self.w3.eth.getBlock('latest')
+        block_identifier = hex(block['number'])  # Every probe must use the same block
+        lower, upper = gas_estimated - 1, block['gasLimit']  # `lower` fails, `upper` is assumed to work
+        if lower >= upper:
+            return gas_estimated
+
+        # Exponential search starting on the node estimation
+        gas_probes = [gas_estimated + precision * (2 ** i - 1) for i in range(probes_per_round)]
+        while True:
+            gas_probes = sorted({gas for gas in gas_probes if lower < gas < upper})
+            if not gas_probes:
+                return upper
+            payload = self._build_estimate_tx_gas_probes_payload(to, value, data, gas_probes, block_identifier)
+            for gas, result in zip(gas_probes, self.ethereum_client._send_batch_request(payload)):
+                # Out of gas. Parity: {'code': -32015, 'message': 'Transaction execution error.',
+                # 'data': 'NotEnoughBaseGas { required: 21632, got: 16935 }'}, Geth: {'code': -32000,
+                # 'message': 'out of gas'}
+                if 'error' in result:
+                    lower = gas
+                else:
+                    upper = gas
+                    break
+
+            if upper - lower <= precision:
+                return upper
+            # Binary search between the bounds
+            step = max((upper - lower) // (probes_per_round + 1), 1)
+            gas_probes = [lower + step * i for i in range(1, probes_per_round + 1)]
+
+    def _estimate_tx_gas_with_web3_or_zero(self, to: str, value: int, data: bytes) -> int:
+        try:
+            return self.estimate_tx_gas_with_web3(to, value, data)
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def _add_tx_gas_overhead(safe_gas_estimation: int, web3_gas_estimation: int) -> int:
         # Costs to route through the proxy and nested calls
         PROXY_GAS = 1000
         # https://github.com/ethereum/solidity/blob/dfe3193c7382c80f1814247a162663a97c3f5e67/libsolidity/codegen/ExpressionCompiler.cpp#L1764
@@ -469,16 +554,54 @@ class Safe:
         # So gas needed by caller will be around 35k
         OLD_CALL_GAS = 35000
 
+        return max(safe_gas_estimation, web3_gas_estimation) + PROXY_GAS + OLD_CALL_GAS
+
+    def estimate_tx_gas(self, to: str, value: int, data: bytes, operation: int) -> int:
+        """
+        Estimate tx gas. Use the max of calculation using safe method and web3 if operation == CALL or
+        use just the safe calculation otherwise
+        """
         safe_gas_estimation = self.estimate_tx_gas_with_safe(to, value, data, operation)
         # We cannot estimate DELEGATECALL (different storage)
         if SafeOperation(operation) == SafeOperation.CALL:
-            try:
-                web3_gas_estimation = self.estimate_tx_gas_with_web3(to, value, data)
-            except ValueError:
-                web3_gas_estimation = 0
-            safe_gas_estimation = max(safe_gas_estimation, web3_gas_estimation)
+            web3_gas_estimation = self._estimate_tx_gas_with_web3_or_zero(to, value, data)
+        else:
+            web3_gas_estimation = 0
+
+        return self._add_tx_gas_overhead(safe_gas_estimation, web3_gas_estimation)
 
-        return safe_gas_estimation + PROXY_GAS + OLD_CALL_GAS
+    def estimate_safe_tx(self, to: str, value: int, data: bytes, operation: int,
+                         gas_token: Optional[str] = NULL_ADDRESS) -> SafeTxEstimation:
+        """
+        Same as calling `estimate_tx_gas`, `estimate_tx_base_gas` and checking the balance of the Safe, but
+        the independent requests to the node (gas estimations, threshold, nonce and balance) are sent
+        concurrently using the `batch_request_executor` of the EthereumClient
+        :param to:
+        :param value:
+        :param data:
+        :param operation:
+        :param gas_token: Gas Token, to use token instead of ether for the gas
+        :return: SafeTxEstimation. Use `has_enough_funds` to check the balance for a gas price
+        :raises: CannotEstimateGas: If gas cannot be estimated
+        """
+        gas_token = gas_token or NULL_ADDRESS
+        executor = self.ethereum_client.batch_request_executor
+        safe_gas_future = executor.submit(self.estimate_tx_gas_with_safe, to, value, data, operation)
+        # We cannot estimate DELEGATECALL (different storage)
+        web3_gas_future = (executor.submit(self._estimate_tx_gas_with_web3_or_zero, to, value, data)
+                           if SafeOperation(operation) == SafeOperation.CALL else None)
+        threshold_future = executor.submit(self.retrieve_threshold)
+        nonce_future = executor.submit(self.retrieve_nonce)
+        if gas_token == NULL_ADDRESS:
+            balance_future = executor.submit(self.ethereum_client.get_balance, self.address)
+        else:
+            balance_future = executor.submit(self.ethereum_client.erc20.get_balance, self.address, gas_token)
+
+        safe_tx_gas = self._add_tx_gas_overhead(safe_gas_future.result(),
+                                                web3_gas_future.result() if web3_gas_future else 0)
+        base_gas = self.estimate_tx_base_gas(to, value, data, operation, gas_token, safe_tx_gas,
+                                             threshold=threshold_future.result(), nonce=nonce_future.result())
+        return SafeTxEstimation(safe_tx_gas, base_gas, gas_token, balance_future.result())
 
     def estimate_tx_operational_gas(self, data_bytes_length: int):
         """
@@ -502,17 +625,34 @@ class Safe:
     def retrieve_code(self) -> HexBytes:
         return self.w3.eth.getCode(self.address)
 
-    def retrieve_fallback_handler(self) -> str:
-        address = self.ethereum_client.w3.eth.getStorageAt(self.address, self.FALLBACK_HANDLER_STORAGE_SLOT)[-20:]
-        if len(address) == 20:
-            return Web3.toChecksumAddress(address)
-        else:
-            return NULL_ADDRESS
+    def _retrieve(self, field: str, block_identifier: Optional[Union[int, str]],
+                  fetch_fn: Callable[[Optional[Union[int, str]]], Any]) -> Any:
+        """
+        :param field: Name of the field for the `state_cache`, including arguments if any
+        :param block_identifier:
+        :param fetch_fn: Function to retrieve the field from the node, receives the block identifier
+        :return: Field value, using the `state_cache` if configured
+        """
+        if self.state_cache is not None and block_identifier is not None:
+            return self.state_cache.get_or_fetch(self.address, field, block_identifier, fetch_fn)
+        return fetch_fn(block_identifier)
+
+    def retrieve_fallback_handler(self, block_identifier: Optional[str] = 'latest') -> str:
+        def fetch_fn(block_identifier: Optional[str]) -> str:
+            address = self.w3.eth.getStorageAt(self.address, self.FALLBACK_HANDLER_STORAGE_SLOT,
+                                               block_identifier=block_identifier)[-20:]
+            if len(address) == 20:
+                return Web3.toChecksumAddress(address)
+            else:
+                return NULL_ADDRESS
+        return self._retrieve('fallback_handler', block_identifier, fetch_fn)
 
     def retrieve_master_copy_address(self, block_identifier: Optional[str] = 'latest') -> str:
-        bytes_address = self.w3.eth.getStorageAt(self.address, 0, block_identifier=block_identifier)[-20:]
-        int_address = int.from_bytes(bytes_address, byteorder='big')
-        return Web3.toChecksumAddress('{:#042x}'.format(int_address))
+        def fetch_fn(block_identifier: Optional[str]) -> str:
+            bytes_address = self.w3.eth.getStorageAt(self.address, 0, block_identifier=block_identifier)[-20:]
+            int_address = int.from_bytes(bytes_address, byteorder='big')
+            return Web3.toChecksumAddress('{:#042x}'.format(int_address))
+        return self._retrieve('master_copy', block_identifier, fetch_fn)
 
     def retrieve_is_hash_approved(self, owner: str, safe_hash: bytes, block_identifier: Optional[str] = 'latest') -> bool:
         return self.get_contract().functions.approvedHashes(owner,
@@ -522,19 +662,94 @@ class Safe:
         return self.get_contract().functions.signedMessages(message_hash).call(block_identifier=block_identifier)
 
     def retrieve_is_owner(self, owner: str, block_identifier: Optional[str] = 'latest') -> bool:
-        return self.get_contract().functions.isOwner(owner).call(block_identifier=block_identifier)
+        return self._retrieve(f'is_owner:{owner}', block_identifier,
+                              lambda block_identifier: self.get_contract().functions.isOwner(owner).call(
+                                  block_identifier=block_identifier))
 
     def retrieve_nonce(self, block_identifier: Optional[str] = 'latest') -> int:
-        return self.get_contract().functions.nonce().call(block_identifier=block_identifier)
+        return self._retrieve('nonce', block_identifier,
+                              lambda block_identifier: self.get_contract().functions.nonce().call(
+                                  block_identifier=block_identifier))
 
-    def retrieve_owners(self, block_identifier: Optional[str] = 'latest')-> List[str]:
-        return self.get_contract().functions.getOwners().call(block_identifier=block_identifier)
+    def retrieve_owners(self, block_identifier: Optional[str] = 'latest') -> List[str]:
+        return list(self._retrieve('owners', block_identifier,
+                                   lambda block_identifier: self.get_contract().functions.getOwners().call(
+                                       block_identifier=block_identifier)))
 
     def retrieve_threshold(self, block_identifier: Optional[str] = 'latest') -> int:
-        return self.get_contract().functions.getThreshold().call(block_identifier=block_identifier)
+        return self._retrieve('threshold', block_identifier,
+                              lambda block_identifier: self.get_contract().functions.getThreshold().call(
+                                  block_identifier=block_identifier))
 
     def retrieve_version(self, block_identifier: Optional[str] = 'latest') -> str:
-        return self.get_contract().functions.VERSION().call(block_identifier=block_identifier)
+        return self._retrieve('version', block_identifier,
+                              lambda block_identifier: self.get_contract().functions.VERSION().call(
+                                  block_identifier=block_identifier))
+
+    def resolve_block_number(self, block_identifier: Union[int, str]) -> int:
+        """
+        :param block_identifier: Block number or block tag
+        :return: Block number. `latest` uses the head of the `state_cache` if configured, so usually no request
+        is needed, or `eth_blockNumber` otherwise. Other tags need the block
+        """
+        return resolve_block_number(self.ethereum_client, block_identifier, state_cache=self.state_cache)
+
+    @classmethod
+    def _build_retrieve_all_info_payload(cls, address: str, block_identifier: str) -> List[Dict[str, Any]]:
+        """
+        :param address: Safe address
+        :param block_identifier: Hex encoded block number or block tag
+        :return: JSON-RPC queries for the fields of `SafeInfo`. Check `_parse_retrieve_all_info`
+        """
+        storage_queries = [{'jsonrpc': '2.0', 'method': 'eth_getStorageAt',
+                            'params': [address, slot, block_identifier]}
+                           for slot in ('0x0', cls.FALLBACK_HANDLER_STORAGE_SLOT)]
+        call_queries = [{'jsonrpc': '2.0', 'method': 'eth_call',
+                         'params': [{'to': address, 'data': selector}, block_identifier]}
+                        for selector in (cls.NONCE_SELECTOR, cls.GET_THRESHOLD_SELECTOR,
+                                         cls.GET_OWNERS_SELECTOR, cls.VERSION_SELECTOR)]
+        return storage_queries + call_queries
+
+    @staticmethod
+    def _parse_retrieve_all_info(address: str, block_number: int, results: List[Dict[str, Any]]) -> SafeInfo:
+        """
+        :param address: Safe address
+        :param block_number: Block number used for the queries
+        :param results: Responses for the queries built by `_build_retrieve_all_info_payload`
+        :return: SafeInfo
+        :raises: CannotRetrieveSafeInfo
+        """
+        try:
+            (master_copy_data, fallback_handler_data, nonce_data, threshold_data,
+             owners_data, version_data) = [HexBytes(result['result']) for result in results]
+            master_copy, fallback_handler = [
+                Web3.toChecksumAddress(data[-20:].rjust(20, b'\0')) for data in (master_copy_data,
+                                                                                 fallback_handler_data)
+            ]
+            owners = tuple(Web3.toChecksumAddress(owner)
+                           for owner in _decode_single(_ADDRESS_ARRAY_DECODER, owners_data))
+            return SafeInfo(address, block_number, master_copy,
+                            _decode_single(_UINT256_DECODER, nonce_data),
+                            _decode_single(_UINT256_DECODER, threshold_data),
+                            owners,
+                            _decode_single(_STRING_DECODER, version_data),
+                            fallback_handler)
+        except (DecodingError, KeyError, ValueError) as exc:
+            raise CannotRetrieveSafeInfo(address) from exc
+
+    def retrieve_all_info(self, block_identifier: Union[int, str] = 'latest') -> SafeInfo:
+        """
+        Get master copy, nonce, threshold, owners, version and fallback handler of the Safe using just one
+        JSON-RPC batch. Every field is retrieved for the same block
+        :param block_identifier: Block number. If a block tag is provided, it will be resolved to a block
+        number first (check `resolve_block_number`)
+        :return: SafeInfo
+        :raises: CannotRetrieveSafeInfo
+        """
+        block_number = self.resolve_block_number(block_identifier)
+        payload = self._build_retrieve_all_info_payload(self.address, hex(block_number))
+        return self._parse_retrieve_all_info(self.address, block_number,
+                                             self.ethereum_client.raw_batch_request(payload))
 
     def build_multisig_tx(self,
                           to: str,
@@ -0,0 +1,105 @@
+from logging import getLogger
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from gnosis.eth import EthereumClient
+from gnosis.eth.constants import NULL_ADDRESS
+from gnosis.eth.ethereum_client import BatchRequestException
+from gnosis.eth.utils import chunks
+
+from .exceptions import CannotRetrieveSafeInfo
+from .safe import Safe, SafeInfo
+from .safe_state_cache import SafeStateCache, resolve_block_number
+
+logger = getLogger(__name__)
+
+
+class SafeBulkReader:
+    """
+    Retrieve `SafeInfo` for a lot of Safes. Queries are sent in chunked JSON-RPC batches processed concurrently
+    by the `EthereumClient`, and results are streamed back in the same order than the addresses
+    """
+    def __init__(self, ethereum_client: EthereumClient, batch_size: Optional[int] = None,
+                 state_cache: Optional[SafeStateCache] = None):
+        """
+        :param ethereum_client:
+        :param batch_size: Maximum number of queries per JSON-RPC batch. If not provided, client default
+        :param state_cache: If provided, `latest` is resolved to its head, the same block used by `Safe`
+        instances sharing it
+        """
+        self.ethereum_client = ethereum_client
+        self.w3 = ethereum_client.w3
+        self.batch_size = batch_size or ethereum_client.batch_request_max_size
+        self.state_cache = state_cache
+
+    @property
+    def safes_per_chunk(self) -> int:
+        """
+        :return: Number of Safes processed together. Enough to keep every batch worker of the client busy,
+        but bounded so memory usage does not depend on the number of Safes
+        """
+        queries_per_safe = len(Safe._build_retrieve_all_info_payload(NULL_ADDRESS, 'latest'))
+        queries_per_chunk = self.batch_size * self.ethereum_client.batch_request_max_workers * 4
+        return max(1, queries_per_chunk // queries_per_safe)
+
+    def iter_all_info(self, addresses: Sequence[str],
+                      block_identifier: Union[int, str] = 'latest') -> Iterator[Union[SafeInfo,
+                                                                                      CannotRetrieveSafeInfo]]:
+        """
+        :param addresses: Safe addresses
+        :param block_identifier: Block number. If a block tag is provided, it will be resolved to the current
+        block number first, so every `SafeInfo` is retrieved for the same block
+        :return: Iterator with a `SafeInfo` for every address, in the same order. If information for a Safe
+        cannot be retrieved a `CannotRetrieveSafeInfo` exception is returned instead, and processing goes on.
+        If a batch fails, the Safes of the chunk not processed yet are retried one by one, so only the Safes
+        failing on their own are reported
+        """
+        block_number = resolve_block_number(self.ethereum_client, block_identifier, state_cache=self.state_cache)
+        hex_block_number = hex(block_number)
+        for addresses_chunk in chunks(addresses, self.safes_per_chunk):
+            payloads = [Safe._build_retrieve_all_info_payload(address, hex_block_number)
+                        for address in addresses_chunk]
+            processed = 0
+            try:
+                results = self.ethereum_client.iter_raw_batch_request([query for payload in payloads
+                                                                       for query in payload],
+                                                                      batch_size=self.batch_size)
+                for address, payload in zip(addresses_chunk, payloads):
+                    safe_results = [next(results) for _ in payload]
+                    processed += 1
+                    try:
+                        yield Safe._parse_retrieve_all_info(address, block_number, safe_results)
+                    except CannotRetrieveSafeInfo as exc:
+                        yield exc
+            except BatchRequestException as exc:
+                logger.warning('Cannot retrieve info for %d Safes: %s - Retrying them one by one',
+                               len(addresses_chunk) - processed, exc)
+                for address, payload in zip(addresses_chunk[processed:], payloads[processed:]):
+                    yield self._retrieve_info(address, block_number, payload)
+
+    def _retrieve_info(self, address: str, block_number: int,
+                       payload: List[Dict[str, Any]]) -> Union[SafeInfo, CannotRetrieveSafeInfo]:
+        """
+        :param address: Safe address
+        :param block_number:
+        :param payload: JSON-RPC queries for the Safe. Check `Safe._build_retrieve_all_info_payload`
+        :return: `SafeInfo` for one Safe, or `CannotRetrieveSafeInfo` if it cannot be retrieved
+        """
+        try:
+            return Safe._parse_retrieve_all_info(address, block_number,
+                                                 self.ethereum_client.raw_batch_request(payload,
+                                                                                        batch_size=self.batch_size))
+        except CannotRetrieveSafeInfo as exc:
+            return exc
+        except BatchRequestException as exc:
+            logger.warning('Cannot retrieve info for Safe %s: %s', address, exc)
+            error = CannotRetrieveSafeInfo(address)
+            error.__cause__ = exc
+            return error
+
+    def retrieve_all_info(self, addresses: Sequence[str],
+                          block_identifier: Union[int, str] = 'latest') -> List[Union[SafeInfo,
+                                                                                      CannotRetrieveSafeInfo]]:
+        """
+        Same as `iter_all_info`, but returns a list
+        """
+        return list(self.iter_all_info(addresses, block_identifier=block_identifier))
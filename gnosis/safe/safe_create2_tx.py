@@ -1,13 +1,18 @@
 import math
 from logging import getLogger
 from typing import List, NamedTuple, Optional
+from weakref import WeakKeyDictionary
 
+from eth_abi.packed import encode_abi_packed
 from hexbytes import HexBytes
 from web3 import Web3
 
+from gnosis.eth.cache import BaseCache, LRUCache
 from gnosis.eth.constants import GAS_CALL_DATA_BYTE, NULL_ADDRESS
-from gnosis.eth.contracts import (get_proxy_factory_contract,
+from gnosis.eth.contracts import (encode_contract_function,
+                                  get_proxy_factory_contract,
                                   get_safe_contract, get_safe_V1_0_0_contract)
+from gnosis.eth.utils import generate_address_2_from_init_code_hash
 
 logger = getLogger(__name__)
 
@@ -40,12 +45,21 @@ class SafeCreate2Tx(NamedTuple):
 
 
 class SafeCreate2TxBuilder:
-    def __init__(self, w3: Web3, master_copy_address: str, proxy_factory_address: str):
+    # Process wide cache for data that cannot change for a deployed contract: `VERSION` of the master copies and
+    # `proxyCreationCode` of the proxy factories. Keys include the network id and the address
+    contract_cache: BaseCache = LRUCache(maxsize=1024)
+    # Network id for every Web3 instance, so it's requested to the node just once
+    _network_ids: 'WeakKeyDictionary[Web3, int]' = WeakKeyDictionary()
+
+    def __init__(self, w3: Web3, master_copy_address: str, proxy_factory_address: str,
+                 contract_cache: Optional[BaseCache] = None):
         """
         Init builder for safe creation using create2
         :param w3: Web3 instance
         :param master_copy_address: `Gnosis Safe` master copy address
         :param proxy_factory_address: `Gnosis Proxy Factory` address
+        :param contract_cache: Cache for master copy version and proxy creation code (e.g. a persistent one).
+        If not provided, the process wide `SafeCreate2TxBuilder.contract_cache` will be used
         """
         assert Web3.isChecksumAddress(master_copy_address)
         assert Web3.isChecksumAddress(proxy_factory_address)
@@ -53,7 +67,10 @@ class SafeCreate2TxBuilder:
         self.w3 = w3
         self.master_copy_address = master_copy_address
         self.proxy_factory_address = proxy_factory_address
-        self.safe_version = get_safe_contract(w3, master_copy_address).functions.VERSION().call()
+        if contract_cache is not None:
+            self.contract_cache = contract_cache
+        self.network_id = self._get_network_id()
+        self.safe_version = self._get_safe_version()
         if self.safe_version == '1.1.1':
             self.master_copy_contract = get_safe_contract(w3, master_copy_address)
         elif self.safe_version == '1.0.0':
@@ -61,6 +78,48 @@ class SafeCreate2TxBuilder:
         else:
             raise ValueError('Safe version must be 1.1.1 or 1.0.0')
         self.proxy_factory_contract = get_proxy_factory_contract(w3, proxy_factory_address)
+        self._proxy_init_code_hash: Optional[bytes] = None
+
+    def _get_network_id(self) -> int:
+        network_id = self._network_ids.get(self.w3)
+        if network_id is None:
+            network_id = self._network_ids[self.w3] = int(self.w3.net.version)
+        return network_id
+
+    def _get_safe_version(self) -> str:
+        """
+        :return: Version of the master copy, retrieved from the node only if not cached
+        """
+        key = f'safe_version:{self.network_id}:{self.master_copy_address}'
+        safe_version = self.contract_cache.get(key)
+        if safe_version is None:
+            safe_version = get_safe_contract(self.w3, self.master_copy_address).functions.VERSION().call()
+            self.contract_cache.set(key, safe_version)
+        return safe_version
+
+    def _get_proxy_creation_code(self) -> bytes:
+        """
+        :return: Creation code of the proxies deployed by the proxy factory, retrieved from the node only if not
+        cached
+        """
+        key = f'proxy_creation_code:{self.network_id}:{self.proxy_factory_address}'
+        proxy_creation_code = self.contract_cache.get(key)
+        if proxy_creation_code is None:
+            proxy_creation_code = self.proxy_factory_contract.functions.proxyCreationCode().call()
+            self.contract_cache.set(key, proxy_creation_code)
+        return proxy_creation_code
+
+    @property
+    def proxy_init_code_hash(self) -> bytes:
+        """
+        :return: keccak of the init code of every proxy (proxy creation code and master copy address), used
+        for CREATE2. It doesn't depend on the Safe setup, so it's calculated only once
+        """
+        if self._proxy_init_code_hash is None:
+            deployment_data = encode_abi_packed(['bytes', 'uint256'], [self._get_proxy_creation_code(),
+                                                                       int(self.master_copy_address, 16)])
+            self._proxy_init_code_hash = Web3.keccak(deployment_data)
+        return self._proxy_init_code_hash
 
     @staticmethod
     def _calculate_gas(owners: List[str], safe_setup_data: bytes, payment_token: str) -> int:
@@ -183,12 +242,17 @@ class SafeCreate2TxBuilder:
             return fixed_creation_cost
 
     def calculate_create2_address(self, safe_setup_data: bytes, salt_nonce: int, callback: Optional[str] = NULL_ADDRESS):
-        proxy_creation_code = self.proxy_factory_contract.functions.proxyCreationCode().call()
-        saltNonceWithCallback = self.w3.sha3(encode_abi_packed(['uint256', 'address'], [salt_nonce, callback]))
-        salt = self.w3.sha3(encode_abi_packed(['bytes', 'bytes'], [self.w3.sha3(safe_setup_data), saltNonceWithCallback]))
-        deployment_data = encode_abi_packed(['bytes', 'uint256'], [proxy_creation_code,
-                                                                   int(self.master_copy_address, 16)])
-        return generate_address_2(self.proxy_factory_contract.address, salt, deployment_data)
+        """
+        Calculate the address of the Safe without calling the node (after the first call for the proxy creation code)
+        :param safe_setup_data: Data for proxy setup
+        :param salt_nonce: Nonce used to generate the salt
+        :param callback: Callback for `createProxyWithCallback`
+        :return: Address of the Safe
+        """
+        salt_nonce_with_callback = Web3.keccak(encode_abi_packed(['uint256', 'address'], [salt_nonce, callback]))
+        salt = Web3.keccak(encode_abi_packed(['bytes', 'bytes'], [Web3.keccak(safe_setup_data),
+                                                                  salt_nonce_with_callback]))
+        return generate_address_2_from_init_code_hash(self.proxy_factory_address, salt, self.proxy_init_code_hash)
 
     def _estimate_gas(self, initializer: bytes, salt_nonce: int,
                       payment_token: str, payment_receiver: str, callback: str) -> int:
@@ -236,7 +300,7 @@ class SafeCreate2TxBuilder:
                                      to: str = NULL_ADDRESS,
                                      ) -> bytes:
         if self.safe_version == '1.1.1':
-            return HexBytes(self.master_copy_contract.functions.setup(
+            return encode_contract_function('safe', 'setup', [
                 owners,
                 threshold,
                 to,  # Contract address for optional delegate call
@@ -245,12 +309,9 @@ class SafeCreate2TxBuilder:
                 payment_token,
                 payment,
                 payment_receiver
-            ).buildTransaction({
-                'gas': 1,
-                'gasPrice': 1,
-            })['data'])
+            ])
         elif self.safe_version == '1.0.0':
-            return HexBytes(self.master_copy_contract.functions.setup(
+            return encode_contract_function('safe_V1_0_0', 'setup', [
                 owners,
                 threshold,
                 to,  # Contract address for optional delegate call
@@ -258,9 +319,6 @@ class SafeCreate2TxBuilder:
                 payment_token,
                 payment,
                 payment_receiver
-            ).buildTransaction({
-                'gas': 1,
-                'gasPrice': 1,
-            })['data'])
+            ])
         else:
             raise ValueError('Safe version must be 1.1.1 or 1.0.0')
@@ -12,9 +12,8 @@ from web3 import Web3
 from web3.contract import ContractConstructor
 
 from gnosis.eth.constants import GAS_CALL_DATA_BYTE, NULL_ADDRESS
-from gnosis.eth.contracts import (get_erc20_contract,
-                                  get_paying_proxy_contract,
-                                  get_safe_V0_0_1_contract)
+from gnosis.eth.contracts import (encode_contract_function, get_erc20_contract,
+                                  get_paying_proxy_contract)
 
 logger = getLogger(__name__)
 
@@ -139,7 +138,10 @@ class SafeCreationTx:
         else:
             payment_token_gas = 0
 
-        data_gas = GAS_CALL_DATA_BYTE * len(safe_setup_data)  # Data gas
+        # Data gas. It has always been calculated using the length of the hex encoded setup data ('0x' and
+        # 2 characters per byte). Keep it, as gas is part of the signed tx and changing it would change payment,
+        # deployer and Safe addresses
+        data_gas = GAS_CALL_DATA_BYTE * (2 + 2 * len(HexBytes(safe_setup_data)))
         gas_per_owner = 18020  # Magic number calculated by testing and averaging owners
         return base_gas + data_gas + payment_token_gas + 270000 + len(owners) * gas_per_owner
 
@@ -277,12 +279,9 @@ class SafeCreationTx:
         return gas
 
     def _get_initial_setup_safe_data(self, owners: List[str], threshold: int) -> bytes:
-        return get_safe_V0_0_1_contract(self.w3, self.master_copy).functions.setup(
+        return encode_contract_function('safe_V0_0_1', 'setup', [
             owners,
             threshold,
             NULL_ADDRESS,  # Contract address for optional delegate call
             b''            # Data payload for optional delegate call
-        ).buildTransaction({
-            'gas': 1,
-            'gasPrice': 1,
-        })['data']
+        ])
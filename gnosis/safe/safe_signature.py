@@ -1,6 +1,6 @@
 from enum import Enum
 from logging import getLogger
-from typing import Iterable, Union
+from typing import Iterable, Optional, Tuple, Union
 
 from eth_account.messages import defunct_hash_message
 from ethereum.utils import checksum_encode
@@ -8,7 +8,9 @@ from hexbytes import HexBytes
 
 from gnosis.eth import EthereumClient
 from gnosis.eth.contracts import get_safe_contract
-from gnosis.safe.signatures import get_signing_address, signature_split
+from gnosis.safe.signatures import (get_signing_address,
+                                    get_signing_addresses, iter_signatures,
+                                    signature_split)
 
 logger = getLogger(__name__)
 
@@ -36,17 +38,37 @@ class SafeSignatureType(Enum):
 
 # TODO Refactor
 class SafeSignature:
-    def __init__(self, signature: EthereumBytes, safe_tx_hash: EthereumBytes):
+    def __init__(self, signature: EthereumBytes, safe_tx_hash: EthereumBytes, owner: Optional[str] = None,
+                 vrs: Optional[Tuple[int, int, int]] = None):
+        """
+        :param signature:
+        :param safe_tx_hash:
+        :param owner: If already known (e.g. recovered in batch), owner is not decoded again
+        :param vrs: If already known, signature is not split again
+        """
         self.signature = HexBytes(signature)
-        self.v, self.r, self.s = signature_split(self.signature)
+        self.v, self.r, self.s = vrs or signature_split(self.signature)
         self.signature_type = SafeSignatureType.from_v(self.v)
-        self.owner = self.decode_owner(self.v, self.r, self.s, safe_tx_hash)
+        self.owner = owner or self.decode_owner(self.v, self.r, self.s, safe_tx_hash)
 
     @classmethod
     def parse_signatures(cls, signatures: EthereumBytes, safe_tx_hash: EthereumBytes) -> Iterable['SafeSignature']:
-        signature_size = 65
-        for i in range(0, len(signatures), signature_size):
-            yield cls(signatures[i: i + signature_size], safe_tx_hash)
+        """
+        Owners of EOA and `eth_sign` signatures are recovered in batch using `get_signing_addresses`. If one
+        cannot be recovered, error is raised when its `SafeSignature` is built, like for the other types
+        """
+        signatures = HexBytes(signatures)
+        parsed_signatures = list(iter_signatures(signatures))
+        signatures_to_recover = {}  # Offset -> (signed hash, v, r, s)
+        for v, r, s, offset in parsed_signatures:
+            if v > 30:  # Support eth_sign
+                signatures_to_recover[offset] = (defunct_hash_message(primitive=safe_tx_hash), v - 4, r, s)
+            elif v > 1:  # EOA signature
+                signatures_to_recover[offset] = (safe_tx_hash, v, r, s)
+
+        owners = dict(zip(signatures_to_recover.keys(), get_signing_addresses(list(signatures_to_recover.values()))))
+        for v, r, s, offset in parsed_signatures:
+            yield cls(signatures[offset:offset + 65], safe_tx_hash, owner=owners.get(offset), vrs=(v, r, s))
 
     def decode_owner(self, v: int, r: int, s: int, safe_tx_hash: EthereumBytes):
         if v == 0:  # Contract signature
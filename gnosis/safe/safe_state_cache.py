@@ -0,0 +1,200 @@
+import time
+from logging import getLogger
+from threading import RLock
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from web3.exceptions import BlockNotFound
+
+from gnosis.eth import EthereumClient
+
+logger = getLogger(__name__)
+
+BlockIdentifier = Union[int, str]
+
+
+class SafeStateCache:
+    """
+    Cache for `Safe.retrieve_*` results, keyed by (Safe address, field, block hash):
+      - `latest` is resolved to the current head. When a new head arrives `latest` lookups stop using the
+        entries of the previous one. Head is refreshed every `head_ttl` seconds, or when `update_head` is called
+        (e.g. by a new blocks listener).
+      - Block numbers (pins) are resolved to the hash of the canonical block, so they can reuse entries.
+      - When a reorg is detected, entries for the blocks that are not canonical anymore are removed.
+      - Other block tags (`pending`, `earliest`...) are not cached.
+    Only the last `max_blocks` blocks are kept.
+    """
+    def __init__(self, ethereum_client: EthereumClient, head_ttl: float = 1.0, max_blocks: int = 64):
+        """
+        :param ethereum_client:
+        :param head_ttl: Seconds until the head is requested again to the node
+        :param max_blocks: Number of blocks behind the head kept on the cache
+        """
+        self.ethereum_client = ethereum_client
+        self.w3 = ethereum_client.w3
+        self.head_ttl = head_ttl
+        self.max_blocks = max_blocks
+        self._lock = RLock()
+        self._head_number: Optional[int] = None
+        self._head_updated: float = 0.
+        self._block_hashes: Dict[int, bytes] = {}  # Canonical block number -> block hash
+        self._entries: Dict[bytes, Dict[Tuple[str, str], Any]] = {}  # Block hash -> {(address, field): value}
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
+
+    def _remove_block(self, block_number: int):
+        block_hash = self._block_hashes.pop(block_number, None)
+        if block_hash:
+            self._entries.pop(block_hash, None)
+
+    def _get_canonical_ancestors(self, number: int, parent_hash: bytes,
+                                 known_hashes: Dict[int, bytes]) -> Tuple[Dict[int, bytes], List[int]]:
+        """
+        Walk back the chain of the new head (starting on its parent) until finding a known block on it
+        :param number: Number of the new head
+        :param parent_hash: Parent hash of the new head
+        :param known_hashes: Known blocks older than the new head
+        :return: Tuple with the canonical hashes found and the known block numbers not on the canonical chain
+        """
+        canonical_hashes: Dict[int, bytes] = {}
+        reorged_numbers: List[int] = []
+        if not known_hashes:
+            return canonical_hashes, reorged_numbers
+
+        lowest_known_number = min(known_hashes)
+        ancestor_number, ancestor_hash = number - 1, parent_hash
+        while ancestor_number >= lowest_known_number:
+            canonical_hashes[ancestor_number] = ancestor_hash
+            if ancestor_number in known_hashes:
+                if known_hashes[ancestor_number] == ancestor_hash:
+                    break  # Common ancestor, older blocks were already checked
+                logger.info('Reorg detected, removing cached block %d', ancestor_number)
+                reorged_numbers.append(ancestor_number)
+            if ancestor_number == lowest_known_number:
+                break
+            try:
+                ancestor_hash = bytes(self.w3.eth.getBlock(ancestor_hash)['parentHash'])
+            except BlockNotFound:
+                # Chain changed while walking it, remaining known blocks cannot be checked
+                logger.info('Block %d not found, removing older cached blocks', ancestor_number)
+                reorged_numbers.extend(known_number for known_number in known_hashes
+                                       if known_number < ancestor_number)
+                break
+            ancestor_number -= 1
+        return canonical_hashes, reorged_numbers
+
+    def update_head(self, block: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Set a new head. Known blocks are checked against the chain of the new head (blocks between them are
+        requested to the node if needed), and reorged blocks are removed
+        :param block: New head block (with `number`, `hash` and `parentHash`). If not provided, it's requested
+        to the node
+        """
+        block = block or self.w3.eth.getBlock('latest')
+        number, block_hash, parent_hash = block['number'], bytes(block['hash']), bytes(block['parentHash'])
+        with self._lock:
+            known_hashes = {known_number: known_hash for known_number, known_hash in self._block_hashes.items()
+                            if number - self.max_blocks < known_number < number}
+
+        # Don't block the cache while requesting blocks to the node
+        canonical_hashes, reorged_numbers = self._get_canonical_ancestors(number, parent_hash, known_hashes)
+
+        with self._lock:
+            for reorged_number in reorged_numbers:
+                if self._block_hashes.get(reorged_number) == known_hashes[reorged_number]:
+                    self._remove_block(reorged_number)
+            # Every known block from the new head on is replaced
+            for known_number in [known_number for known_number in self._block_hashes if known_number >= number]:
+                if known_number != number or self._block_hashes[known_number] != block_hash:
+                    self._remove_block(known_number)
+
+            for canonical_number, canonical_hash in canonical_hashes.items():
+                if self._block_hashes.get(canonical_number, canonical_hash) != canonical_hash:
+                    self._remove_block(canonical_number)
+                self._block_hashes[canonical_number] = canonical_hash
+            self._block_hashes[number] = block_hash
+            self._head_number = number
+            self._head_updated = time.monotonic()
+
+            for old_number in [known_number for known_number in self._block_hashes
+                               if known_number <= self._head_number - self.max_blocks]:
+                self._remove_block(old_number)
+
+    def get_head_number(self) -> int:
+        """
+        :return: Number of the head, requested to the node only if older than `head_ttl`
+        """
+        with self._lock:
+            head_expired = self._head_number is None or time.monotonic() - self._head_updated > self.head_ttl
+        if head_expired:
+            self.update_head()
+        return self._head_number
+
+    def _resolve_block(self, block_identifier: BlockIdentifier) -> Optional[Tuple[int, bytes]]:
+        """
+        :param block_identifier:
+        :return: Tuple with number and hash of the block, `None` if it cannot be cached
+        """
+        if block_identifier == 'latest':
+            block_number = self.get_head_number()
+            with self._lock:
+                block_hash = self._block_hashes.get(block_number)
+        elif isinstance(block_identifier, int):
+            if self._head_number is None:
+                self.update_head()
+            with self._lock:
+                if not (self._head_number - self.max_blocks < block_identifier <= self._head_number):
+                    return None
+                block_number = block_identifier
+                block_hash = self._block_hashes.get(block_number)
+            if block_hash is None:
+                block_hash = bytes(self.w3.eth.getBlock(block_number)['hash'])
+                with self._lock:
+                    block_hash = self._block_hashes.setdefault(block_number, block_hash)
+        else:
+            return None
+        return (block_number, block_hash) if block_hash else None
+
+    def get_or_fetch(self, address: str, field: str, block_identifier: BlockIdentifier,
+                     fetch_fn: Callable[[BlockIdentifier], Any]) -> Any:
+        """
+        :param address: Safe address
+        :param field: Name of the field, including arguments if any
+        :param block_identifier:
+        :param fetch_fn: Function to retrieve the value from the node if not cached, receives the block identifier
+        :return: Cached value if found, otherwise value returned by `fetch_fn`
+        """
+        block = self._resolve_block(block_identifier)
+        if block is None:
+            return fetch_fn(block_identifier)
+
+        block_number, block_hash = block
+        key = (address, field)
+        with self._lock:
+            entries = self._entries.get(block_hash, {})
+            if key in entries:
+                return entries[key]
+
+        # Use the resolved block number instead of `latest`, so value matches the block hash
+        value = fetch_fn(block_number)
+        with self._lock:
+            if self._block_hashes.get(block_number) == block_hash:  # Block could be removed by a reorg
+                self._entries.setdefault(block_hash, {})[key] = value
+        return value
+
+
+def resolve_block_number(ethereum_client: EthereumClient, block_identifier: BlockIdentifier,
+                         state_cache: Optional[SafeStateCache] = None) -> int:
+    """
+    :param ethereum_client:
+    :param block_identifier: Block number or block tag
+    :param state_cache: If provided, `latest` is resolved to its head, so reads using the cache and reads
+    resolved here are pinned to the same block
+    :return: Block number. `latest` uses `eth_blockNumber` if no `state_cache` is provided. Other tags need the block
+    """
+    if isinstance(block_identifier, int):
+        return block_identifier
+    elif block_identifier == 'latest':
+        return state_cache.get_head_number() if state_cache is not None else ethereum_client.w3.eth.blockNumber
+    else:
+        return ethereum_client.w3.eth.getBlock(block_identifier)['number']
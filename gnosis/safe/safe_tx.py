@@ -1,16 +1,16 @@
-from typing import Any, Dict, List, NoReturn, Optional, Tuple, Type
+from typing import (Any, Dict, Iterable, List, NoReturn, Optional, Tuple,
+                    Type)
 
 from eth_account import Account
 from hexbytes import HexBytes
 from packaging.version import Version
 from web3.exceptions import BadFunctionCallOutput
 
-from py_eth_sig_utils.eip712 import encode_typed_data
-
 from gnosis.eth import EthereumClient
 from gnosis.eth.constants import NULL_ADDRESS
 from gnosis.eth.contracts import get_safe_contract
 
+from .eip712 import get_safe_tx_hash
 from .exceptions import (CouldNotPayGasWithEther, CouldNotPayGasWithToken,
                          HashHasNotBeenApproved,
                          InvalidContractSignatureLocation, InvalidInternalTx,
@@ -19,13 +19,16 @@ from .exceptions import (CouldNotPayGasWithEther, CouldNotPayGasWithToken,
                          NotEnoughSafeTransactionGas,
                          OnlyOwnersCanApproveAHash, OwnerManagerException,
                          SignatureNotProvidedByOwner, SignaturesDataTooShort)
-from .signatures import (get_signing_address, signature_split,
-                         signature_to_bytes)
+from .signatures import (get_signing_address, get_signing_addresses,
+                         iter_signatures, signature_to_bytes)
 
 
 class SafeTx:
     tx: Dict[str, Any]  # If executed, `tx` is set
     tx_hash: bytes  # If executed, `tx_hash` is set
+    # Fields used to calculate `safe_tx_hash`. If one of them is set, cached hash is invalidated
+    SAFE_TX_HASH_FIELDS = frozenset(('safe_address', 'to', 'value', 'data', 'operation', 'safe_tx_gas', 'base_gas',
+                                     'gas_price', 'gas_token', 'refund_receiver', 'safe_nonce', 'safe_version'))
 
     def __init__(self,
                  ethereum_client: EthereumClient,
@@ -59,18 +62,49 @@ class SafeTx:
         self.signatures = signatures
         self.safe_version = safe_version
 
+    def __setattr__(self, name: str, value: Any):
+        if name in self.SAFE_TX_HASH_FIELDS:
+            self.__dict__.pop('_safe_tx_hash', None)
+        super().__setattr__(name, value)
+
     @property
     def w3(self):
         return self.ethereum_client.w3
 
     @property
     def safe_tx_hash(self) -> HexBytes:
+        """
+        :return: EIP712 hash of the tx. It's cached until one of the `SAFE_TX_HASH_FIELDS` is set
+        """
+        safe_tx_hash = self.__dict__.get('_safe_tx_hash')
+        if safe_tx_hash is None:
+            safe_tx_hash = self._safe_tx_hash = self._calculate_safe_tx_hash()
+        return safe_tx_hash
+
+    def _calculate_safe_tx_hash(self) -> HexBytes:
         if self.safe_nonce is None:
             raise ValueError('`safe_nonce` must be set to calculate hash')
+        return get_safe_tx_hash(self.safe_address, self.to, self.value, self.data, self.operation,
+                                self.safe_tx_gas, self.base_gas, self.gas_price, self.gas_token,
+                                self.refund_receiver, self.safe_nonce, safe_version=self.safe_version)
+
+    @staticmethod
+    def hash_many(safe_txs: Iterable['SafeTx']) -> List[HexBytes]:
+        """
+        :param safe_txs:
+        :return: `safe_tx_hash` for every SafeTx. Hashes are cached on every SafeTx
+        """
+        return [safe_tx.safe_tx_hash for safe_tx in safe_txs]
+
+    @property
+    def eip712_structured_data(self) -> Dict[str, Any]:
+        """
+        :return: Generic EIP712 typed data for the tx, e.g. to use with `eth_signTypedData`
+        """
         data = self.data.hex() if self.data else ''
         base_gas_name = 'baseGas' if Version(self.safe_version) >= Version('1.0.0') else 'dataGas'
 
-        data = {
+        return {
             'types': {
                 'EIP712Domain': [
                     {'name': 'verifyingContract', 'type': 'address'},
@@ -106,15 +140,13 @@ class SafeTx:
             },
         }
 
-        return HexBytes(encode_typed_data(data))
-
     @property
     def signers(self) -> List[str]:
-        owners = []
-        for i in range(len(self.signatures) // 65):
-            v, r, s = signature_split(self.signatures, i)
-            owners.append(get_signing_address(self.safe_tx_hash, v, r, s))
-        return owners
+        safe_tx_hash = self.safe_tx_hash
+        signatures = [(safe_tx_hash, v, r, s) for v, r, s, _ in iter_signatures(self.signatures)]
+        # Recover again the signatures that failed, so the error is raised
+        return [signing_address or get_signing_address(*signature)
+                for signature, signing_address in zip(signatures, get_signing_addresses(signatures))]
 
     @property
     def sorted_signers(self):
@@ -269,8 +301,9 @@ class SafeTx:
                                         signature_dict['s']))
 
         # Insert signature sorted
-        if account.address not in self.signers:
-            new_owners = self.signers + [account.address]
+        signers = self.signers
+        if account.address not in signers:
+            new_owners = signers + [account.address]
             new_owner_pos = sorted(new_owners, key=lambda x: x.lower()).index(account.address)
             self.signatures = (self.signatures[: 65 * new_owner_pos] + signature +
                                self.signatures[65 * new_owner_pos:])
@@ -279,6 +312,6 @@ class SafeTx:
     def unsign(self, address: str) -> bool:
         for pos, signer in enumerate(self.signers):
             if signer == address:
-                self.signatures = self.signatures.replace(self.signatures[pos * 65: pos * 65 + 65], b'')
+                self.signatures = self.signatures[:pos * 65] + self.signatures[pos * 65 + 65:]
                 return True
         return False
@@ -1,8 +1,19 @@
-from typing import List, Tuple, Union
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
 
 from ethereum.utils import checksum_encode, ecrecover_to_pub, sha3
 from hexbytes import HexBytes
 
+from gnosis.eth.cache import LRUCache
+
+# Signing addresses recovered by `get_signing_addresses`, by hash and signature
+SIGNING_ADDRESS_CACHE = LRUCache(maxsize=16384)
+
+# Recovery backend: `ecrecover_to_pub` already selects the fastest secp256k1 backend available, libsecp256k1 through
+# `coincurve` if installed (`pip install coincurve`) and pure python `py_ecc` otherwise, so there's no backend
+# selection here. Signatures are recovered in process: with `coincurve` a recovery takes microseconds, so a process
+# pool would spend more time pickling than recovering, and forking processes that already run threads (e.g. the
+# `EthereumClient` batch workers) is not safe
+
 
 def signature_split(signatures: Union[bytes, str], pos: int = 0) -> Tuple[int, int, int]:
     """
@@ -10,7 +21,9 @@ def signature_split(signatures: Union[bytes, str], pos: int = 0) -> Tuple[int, i
     :param pos: position of the signature
     :return: Tuple with v, r, s
     """
-    signatures = HexBytes(signatures)
+    if isinstance(signatures, str):
+        signatures = HexBytes(signatures)
+    signatures = memoryview(signatures)
     signature_pos = 65 * pos
     v = signatures[64 + signature_pos]
     r = int.from_bytes(signatures[signature_pos:32 + signature_pos], 'big')
@@ -19,6 +32,22 @@ def signature_split(signatures: Union[bytes, str], pos: int = 0) -> Tuple[int, i
     return v, r, s
 
 
+def iter_signatures(signatures: Union[bytes, str]) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Walk the signatures buffer once without copying it. Trailing bytes not filling a signature are ignored
+    :param signatures: signatures in form of {bytes32 r}{bytes32 s}{uint8 v}, concatenated
+    :return: Iterator of tuples with v, r, s and the offset of the signature in the buffer
+    """
+    if isinstance(signatures, str):
+        signatures = HexBytes(signatures)
+    signatures = memoryview(signatures)
+    for offset in range(0, len(signatures) - 64, 65):
+        yield (signatures[offset + 64],
+               int.from_bytes(signatures[offset:offset + 32], 'big'),
+               int.from_bytes(signatures[offset + 32:offset + 64], 'big'),
+               offset)
+
+
 def signature_to_bytes(vrs: Tuple[int, int, int]) -> bytes:
     """
     Convert signature to bytes
@@ -51,3 +80,26 @@ def get_signing_address(signed_hash: Union[bytes, str], v: int, r: int, s: int)
     encoded_64_address = ecrecover_to_pub(HexBytes(signed_hash), v, r, s)
     address_bytes = sha3(encoded_64_address)[-20:]
     return checksum_encode(address_bytes)
+
+
+def get_signing_addresses(signatures: Sequence[Tuple[Union[bytes, str], int, int, int]]) -> List[Optional[str]]:
+    """
+    Same as calling `get_signing_address` for every signature, but results are cached on `SIGNING_ADDRESS_CACHE`
+    :param signatures: Tuples of signed hash, v, r and s
+    :return: Checksummed ethereum address for every signature. `None` if it cannot be recovered, so one
+    invalid signature doesn't make the other ones fail (`get_signing_address` can be used to get the error)
+    """
+    signatures = [(bytes(HexBytes(signed_hash)), v, r, s) for signed_hash, v, r, s in signatures]
+    keys = ['{}:{}:{}:{}'.format(signed_hash.hex(), v, r, s) for signed_hash, v, r, s in signatures]
+    signing_addresses = SIGNING_ADDRESS_CACHE.get_many(keys)
+    missing = {key: signature for key, signature in zip(keys, signatures) if key not in signing_addresses}
+    if missing:
+        new_signing_addresses = {}
+        for key, (signed_hash, v, r, s) in missing.items():
+            try:
+                new_signing_addresses[key] = get_signing_address(signed_hash, v, r, s)
+            except (ValueError, TypeError):  # Signature cannot be recovered
+                pass
+        SIGNING_ADDRESS_CACHE.set_many(new_signing_addresses)
+        signing_addresses.update(new_signing_addresses)
+    return [signing_addresses.get(key) for key in keys]
@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from eth_account import Account
+from hexbytes import HexBytes
+
+from py_eth_sig_utils.eip712 import encode_typed_data
+
+from gnosis.eth.constants import NULL_ADDRESS
+from gnosis.eth.contracts import get_safe_contract
+
+from ..eip712 import get_safe_message_hash, get_safe_tx_hash
+from ..safe_tx import SafeTx
+from .safe_test_case import SafeTestCaseMixin
+
+
+class TestEip712(SafeTestCaseMixin, TestCase):
+    def test_get_safe_tx_hash(self):
+        safe_address = Account.create().address
+        to = Account.create().address
+        for safe_version in ('0.1.0', '1.0.0', '1.1.1'):
+            for data in (b'', HexBytes('0x562944')):
+                safe_tx = SafeTx(self.ethereum_client, safe_address, to, 5000000, data, 0, 50000, 100, 10000,
+                                 NULL_ADDRESS, NULL_ADDRESS, safe_nonce=67, safe_version=safe_version)
+                self.assertEqual(get_safe_tx_hash(safe_address, to, 5000000, data, 0, 50000, 100, 10000,
+                                                  NULL_ADDRESS, NULL_ADDRESS, 67, safe_version=safe_version),
+                                 HexBytes(encode_typed_data(safe_tx.eip712_structured_data)))
+
+        with self.assertRaises(ValueError):
+            get_safe_tx_hash(safe_address, '0x12', 0, b'', 0, 0, 0, 0, NULL_ADDRESS, NULL_ADDRESS, 0)
+
+    def test_get_safe_message_hash(self):
+        safe_address = self.deploy_test_safe().safe_address
+        message = b'Gnosis Safe'
+        self.assertEqual(get_safe_message_hash(safe_address, message),
+                         get_safe_contract(self.w3, safe_address).functions.getMessageHash(message).call())
+
+    def test_hash_many(self):
+        safe_address = Account.create().address
+        safe_txs = [SafeTx(self.ethereum_client, safe_address, Account.create().address, i, b'', 0, 0, 0, 0,
+                           NULL_ADDRESS, NULL_ADDRESS, safe_nonce=i) for i in range(5)]
+        self.assertEqual(SafeTx.hash_many(safe_txs), [safe_tx.safe_tx_hash for safe_tx in safe_txs])
+        self.assertEqual(SafeTx.hash_many([]), [])
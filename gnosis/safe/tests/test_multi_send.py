@@ -5,7 +5,9 @@ from django.test import TestCase
 from eth_account import Account
 from hexbytes import HexBytes
 
-from ..multi_send import MultiSendOperation, MultiSendTx
+from gnosis.eth.contracts import encode_contract_function
+
+from ..multi_send import MultiSend, MultiSendOperation, MultiSendTx
 from .safe_test_case import SafeTestCaseMixin
 
 logger = logging.getLogger(__name__)
@@ -25,3 +27,41 @@ class TestMultiSend(SafeTestCaseMixin, TestCase):
         self.assertEqual(new_multi_send_tx.address, address)
         self.assertEqual(new_multi_send_tx.value, value)
         self.assertEqual(new_multi_send_tx.data, data)
+
+    def test_decode_multisend_data(self):
+        address = Account.create().address
+        multi_send_txs = [MultiSendTx(MultiSendOperation.CALL, address, 5, HexBytes('0x1234')),
+                          MultiSendTx(MultiSendOperation.DELEGATE_CALL, address, 0, HexBytes(''))]
+        self.assertEqual(list(MultiSend.decode_multisend_data(b''.join(tx.encoded_data for tx in multi_send_txs))),
+                         multi_send_txs)
+
+        # Nested MultiSend
+        nested_multi_send_tx = MultiSendTx(MultiSendOperation.DELEGATE_CALL, self.multi_send_contract.address, 0,
+                                           HexBytes(self.multi_send.build_tx_data(multi_send_txs)))
+        big_multi_send_tx = MultiSendTx(MultiSendOperation.CALL, address, 1, HexBytes(b'\xff' * 10000))
+        data = self.multi_send.build_tx_data([big_multi_send_tx, nested_multi_send_tx])
+        self.assertEqual(list(MultiSend.from_transaction_data(data)), [big_multi_send_tx] + multi_send_txs)
+        self.assertEqual(list(MultiSend.from_transaction_data(data, nested=False)),
+                         [big_multi_send_tx, nested_multi_send_tx])
+
+        decoded_multi_send_txs = list(MultiSend.from_transaction_data(HexBytes(data).hex(), copy_data=False))
+        self.assertIsInstance(decoded_multi_send_txs[0].data, memoryview)
+        self.assertEqual(decoded_multi_send_txs, [big_multi_send_tx] + multi_send_txs)
+
+        with self.assertRaisesMessage(ValueError, 'not a multiSend call'):
+            list(MultiSend.from_transaction_data(HexBytes('0x12345678')))
+        with self.assertRaises(ValueError):
+            list(MultiSend.decode_multisend_data(multi_send_txs[0].encoded_data[:-1]))
+
+    def test_encode_multisend_data(self):
+        multi_send_txs = [MultiSendTx(MultiSendOperation(i % 2), Account.create().address, i * 1000,
+                                      HexBytes(bytes(range(i * 7)))) for i in range(10)]
+        encoded_multisend_data = MultiSend.encode_multisend_data(multi_send_txs)
+        self.assertEqual(encoded_multisend_data, b''.join(tx.encoded_data for tx in multi_send_txs))
+        self.assertEqual(list(MultiSend.decode_multisend_data(encoded_multisend_data)), multi_send_txs)
+        self.assertEqual(MultiSend.encode_multisend_tx_data(multi_send_txs),
+                         encode_contract_function('multi_send', 'multiSend', [encoded_multisend_data]))
+        self.assertEqual(MultiSend.encode_multisend_tx_data([]),
+                         encode_contract_function('multi_send', 'multiSend', [b'']))
+        self.assertEqual(self.multi_send.build_tx_data(multi_send_txs),
+                         MultiSend.encode_multisend_tx_data(multi_send_txs))
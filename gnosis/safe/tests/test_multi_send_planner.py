@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from eth_account import Account
+from hexbytes import HexBytes
+
+from ..exceptions import MultiSendTxGasTooHigh
+from ..multi_send import MultiSend, MultiSendOperation, MultiSendTx
+from ..multi_send_planner import MultiSendPlanner
+from ..safe import Safe, SafeOperation
+from .safe_test_case import SafeTestCaseMixin
+
+
+class TestMultiSendPlanner(SafeTestCaseMixin, TestCase):
+    def test_pack(self):
+        safe = Safe(self.deploy_test_safe().safe_address, self.ethereum_client)
+        multi_send_planner = MultiSendPlanner(safe, self.multi_send, gas_per_tx=1000)
+        multi_send_txs = [MultiSendTx(MultiSendOperation.CALL, Account.create().address, 1, HexBytes(''))
+                          for _ in range(10)]
+        tx_gas = multi_send_planner.estimate_multi_send_tx_gas(multi_send_txs[0])
+        self.assertGreater(tx_gas, 1000)
+
+        batches = multi_send_planner.pack(multi_send_txs, tx_gas * 3)
+        self.assertEqual([len(batch) for batch in batches], [3, 3, 3, 1])
+        self.assertEqual([tx for batch in batches for tx in batch], multi_send_txs)
+        self.assertEqual(multi_send_planner.pack(multi_send_txs, 1), [[tx] for tx in multi_send_txs])
+        self.assertEqual(multi_send_planner.pack([], 1), [])
+
+        multi_send_planner.gas_budget = 100000
+        self.assertEqual(multi_send_planner.get_max_batch_gas(), 100000)
+
+    def test_plan(self):
+        safe = Safe(self.deploy_test_safe(initial_funding_wei=10).safe_address, self.ethereum_client)
+        multi_send_txs = [MultiSendTx(MultiSendOperation.CALL, Account.create().address, 1, HexBytes(''))
+                          for _ in range(10)]
+        multi_send_planner = MultiSendPlanner(safe, self.multi_send)
+        self.assertEqual(multi_send_planner.plan([]), [])
+
+        tx_gas = multi_send_planner.estimate_multi_send_tx_gas(multi_send_txs[0])
+        max_batch_gas = tx_gas * 4
+        multi_send_planner.gas_budget = max_batch_gas
+        safe_txs = multi_send_planner.plan(multi_send_txs, safe_nonce=5)
+        self.assertGreaterEqual(len(safe_txs), 3)
+        self.assertEqual([safe_tx.safe_nonce for safe_tx in safe_txs], list(range(5, 5 + len(safe_txs))))
+        decoded_multi_send_txs = []
+        for safe_tx in safe_txs:
+            self.assertEqual(safe_tx.to, self.multi_send.address)
+            self.assertEqual(safe_tx.operation, SafeOperation.DELEGATE_CALL.value)
+            self.assertGreater(safe_tx.safe_tx_gas, 0)
+            self.assertGreater(safe_tx.base_gas, 0)
+            # Total gas of the tx fits on the budget, not only `safe_tx_gas`
+            self.assertLessEqual(safe_tx.safe_tx_gas + safe_tx.base_gas, max_batch_gas)
+            decoded_multi_send_txs.extend(MultiSend.from_transaction_data(safe_tx.data))
+        self.assertEqual(decoded_multi_send_txs, multi_send_txs)
+
+        # Batches needing more gas than the maximum are split
+        with mock.patch.object(Safe, 'estimate_tx_gas', side_effect=lambda to, value, data, operation: (
+                max_batch_gas + 1 if len(data) > 300 else 1)):
+            safe_txs = multi_send_planner.plan(multi_send_txs, safe_nonce=0)
+            self.assertEqual([safe_tx.safe_nonce for safe_tx in safe_txs], list(range(len(safe_txs))))
+            self.assertGreater(len(safe_txs), 3)
+            self.assertEqual([tx for safe_tx in safe_txs for tx in MultiSend.from_transaction_data(safe_tx.data)],
+                             multi_send_txs)
+
+        # `base_gas` counts too, and a tx not fitting on its own cannot be planned
+        with mock.patch.object(Safe, 'estimate_tx_gas', return_value=max_batch_gas):
+            with self.assertRaises(MultiSendTxGasTooHigh):
+                multi_send_planner.plan(multi_send_txs, safe_nonce=0)
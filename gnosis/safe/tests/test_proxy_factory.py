@@ -1,4 +1,5 @@
 import logging
+from unittest import mock
 
 from django.test import TestCase
 
@@ -30,6 +31,35 @@ class TestProxyFactory(SafeTestCaseMixin, TestCase):
                                                                     Account.create().address)
         self.assertTrue(self.proxy_factory.check_proxy_code(ethereum_tx_sent.contract_address))
 
+    def test_check_proxy_codes(self):
+        self.assertEqual(self.proxy_factory.check_proxy_codes([]), [])
+        proxy_contract_address = self.deploy_test_safe().safe_address
+        master_copy_address = Safe.deploy_master_contract(self.ethereum_client,
+                                                          self.ethereum_test_account).contract_address
+        ethereum_tx_sent = self.proxy_factory.deploy_proxy_contract(self.ethereum_test_account,
+                                                                    Account.create().address)
+        addresses = [proxy_contract_address, master_copy_address, ethereum_tx_sent.contract_address,
+                     Account.create().address]
+        self.assertEqual(self.proxy_factory.check_proxy_codes(addresses), [True, False, True, False])
+        self.assertEqual(self.proxy_factory.check_proxy_codes(addresses, batch_size=1),
+                         [self.proxy_factory.check_proxy_code(address) for address in addresses])
+
+    def test_get_proxy_runtime_code(self):
+        proxy_factory = ProxyFactory(self.proxy_factory_contract_address, self.ethereum_client)
+        proxy_runtime_code = proxy_factory.get_proxy_runtime_code()
+        network_id = int(self.w3.net.version)
+        self.assertEqual(ProxyFactory.proxy_runtime_codes.get(
+            f'proxy_runtime_code:{network_id}:{self.proxy_factory_contract_address}'), proxy_runtime_code)
+        with mock.patch.object(ProxyFactory, 'get_contract', wraps=proxy_factory.get_contract) as get_contract_mock:
+            self.assertEqual(proxy_factory.get_proxy_runtime_code(), proxy_runtime_code)
+            get_contract_mock.assert_not_called()
+
+            # Same address on other network is not taken from the cache
+            other_network_proxy_factory = ProxyFactory(self.proxy_factory_contract_address, self.ethereum_client)
+            other_network_proxy_factory._network_id = network_id + 1
+            self.assertEqual(other_network_proxy_factory.get_proxy_runtime_code(), proxy_runtime_code)
+            get_contract_mock.assert_called_once_with()
+
     def test_deploy_proxy_contract(self):
         s = 15
         owners = [Account.create().address for _ in range(2)]
@@ -85,4 +115,11 @@ class TestProxyFactory(SafeTestCaseMixin, TestCase):
         self.assertEqual(safe.retrieve_master_copy_address(), safe_create2_tx.master_copy_address)
 
     def test_get_proxy_runtime_code(self):
-        self.assertGreater(len(self.proxy_factory.get_proxy_runtime_code()), 4)
+        proxy_runtime_code = self.proxy_factory.get_proxy_runtime_code()
+        self.assertGreater(len(proxy_runtime_code), 4)
+
+        # Runtime code is shared between instances
+        proxy_factory = ProxyFactory(self.proxy_factory.address, self.ethereum_client)
+        with mock.patch.object(ProxyFactory, 'get_contract') as get_contract_mock:
+            self.assertEqual(proxy_factory.get_proxy_runtime_code(), proxy_runtime_code)
+            get_contract_mock.assert_not_called()
@@ -1,4 +1,5 @@
 import logging
+from unittest import mock
 
 from django.test import TestCase
 
@@ -6,11 +7,13 @@ from eth_account import Account
 from hexbytes import HexBytes
 from web3 import Web3
 
+from gnosis.eth import EthereumClient
 from gnosis.eth.constants import GAS_CALL_DATA_BYTE, NULL_ADDRESS
 from gnosis.eth.contracts import get_safe_contract
 from gnosis.eth.utils import get_eth_address_with_key
 
-from ..exceptions import CouldNotPayGasWithEther, CouldNotPayGasWithToken
+from ..exceptions import (CannotRetrieveSafeInfo, CouldNotPayGasWithEther,
+                          CouldNotPayGasWithToken)
 from ..safe import Safe
 from ..signatures import signature_to_bytes, signatures_to_bytes
 from .safe_test_case import SafeTestCaseMixin
@@ -314,6 +317,46 @@ class TestSafe(SafeTestCaseMixin, TestCase):
         safe_tx_gas = safe.estimate_tx_gas(to, value, data, operation)
         self.assertGreater(safe_tx_gas, 0)
 
+    def test_estimate_safe_tx(self):
+        to = Account().create().address
+        value = 123
+        data = HexBytes('0xabcdef')
+        safe = Safe(self.deploy_test_safe(initial_funding_wei=value + 23000).safe_address, self.ethereum_client)
+        for operation in (0, 1):
+            safe_tx_estimation = safe.estimate_safe_tx(to, value, data, operation)
+            self.assertEqual(safe_tx_estimation.safe_tx_gas, safe.estimate_tx_gas(to, value, data, operation))
+            self.assertEqual(safe_tx_estimation.base_gas,
+                             safe.estimate_tx_base_gas(to, value, data, operation, NULL_ADDRESS,
+                                                       safe_tx_estimation.safe_tx_gas))
+            self.assertEqual(safe_tx_estimation.gas_token, NULL_ADDRESS)
+            self.assertEqual(safe_tx_estimation.gas_token_balance, value + 23000)
+            self.assertTrue(safe_tx_estimation.has_enough_funds(0))
+            self.assertFalse(safe_tx_estimation.has_enough_funds(1))
+
+        # Estimation tasks must not wait for other tasks of the executor, even with just one worker and small
+        # batches
+        ethereum_client = EthereumClient(self.ethereum_client.ethereum_node_url, batch_request_max_size=1,
+                                         batch_request_max_workers=1)
+        with mock.patch.object(ethereum_client, 'estimate_gas', return_value=5000):
+            safe_tx_estimation = Safe(safe.address, ethereum_client).estimate_safe_tx(to, value, data, 0)
+        self.assertGreater(safe_tx_estimation.safe_tx_gas, 0)
+
+    def test_estimate_tx_gas_with_web3(self):
+        to = Account().create().address
+        value = 123
+        safe = Safe(self.deploy_test_safe(initial_funding_wei=value).safe_address, self.ethereum_client)
+        gas_estimated = self.ethereum_client.estimate_gas(safe.address, to, value, b'')
+        self.assertEqual(safe.estimate_tx_gas_with_web3(to, value, b''), gas_estimated)
+
+        # Node estimation is too low, gas is searched until a probe works
+        with mock.patch.object(self.ethereum_client, 'estimate_gas', return_value=5000):
+            with mock.patch.object(self.ethereum_client, '_send_batch_request',
+                                   wraps=self.ethereum_client._send_batch_request) as send_batch_request_mock:
+                safe_tx_gas = safe.estimate_tx_gas_with_web3(to, value, b'', precision=1000)
+                self.assertGreaterEqual(safe_tx_gas, gas_estimated)
+                self.assertLessEqual(safe_tx_gas, gas_estimated + 1000)
+                self.assertLessEqual(send_batch_request_mock.call_count, 4)
+
     def test_estimate_tx_operational_gas(self):
         for threshold in range(2, 5):
             safe_creation = self.deploy_test_safe(threshold=threshold, number_owners=6)
@@ -345,6 +388,34 @@ class TestSafe(SafeTestCaseMixin, TestCase):
         for owner in safe_creation.owners:
             self.assertTrue(safe.retrieve_is_owner(owner))
 
+    def test_retrieve_all_info(self):
+        random_fallback_handler = Account.create().address
+        safe_creation = self.deploy_test_safe(fallback_handler=random_fallback_handler)
+        safe = Safe(safe_creation.safe_address, self.ethereum_client)
+        safe_info = safe.retrieve_all_info()
+        self.assertEqual(safe_info.address, safe.address)
+        self.assertEqual(safe_info.block_number, self.ethereum_client.current_block_number)
+        self.assertEqual(safe_info.master_copy, safe.retrieve_master_copy_address())
+        self.assertEqual(safe_info.nonce, safe.retrieve_nonce())
+        self.assertEqual(safe_info.threshold, safe_creation.threshold)
+        self.assertIsInstance(safe_info.owners, tuple)
+        self.assertEqual(list(safe_info.owners), safe.retrieve_owners())
+        self.assertEqual(safe_info.version, safe.retrieve_version())
+        self.assertEqual(safe_info.fallback_handler, random_fallback_handler)
+        self.assertEqual(safe.retrieve_all_info(block_identifier=safe_info.block_number), safe_info)
+        with self.assertRaises(AttributeError):
+            safe_info.nonce = 1
+
+        with self.assertRaises(CannotRetrieveSafeInfo):
+            Safe(Account.create().address, self.ethereum_client).retrieve_all_info()
+
+        with mock.patch.object(self.w3.eth, 'getBlock', side_effect=self.w3.eth.getBlock) as get_block_mock:
+            self.assertEqual(safe.resolve_block_number(5), 5)
+            self.assertEqual(safe.resolve_block_number('latest'), self.ethereum_client.current_block_number)
+            get_block_mock.assert_not_called()
+            self.assertEqual(safe.resolve_block_number('earliest'), 0)
+            get_block_mock.assert_called_once_with('earliest')
+
     def test_retrieve_is_hash_approved(self):
         safe_creation = self.deploy_test_safe(owners=[self.ethereum_test_account.address])
         safe = Safe(safe_creation.safe_address, self.ethereum_client)
@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from eth_account import Account
+
+from gnosis.eth.ethereum_client import BatchRequestException
+
+from ..exceptions import CannotRetrieveSafeInfo
+from ..safe import Safe
+from ..safe_bulk_reader import SafeBulkReader
+from ..safe_state_cache import SafeStateCache
+from .safe_test_case import SafeTestCaseMixin
+
+
+class TestSafeBulkReader(SafeTestCaseMixin, TestCase):
+    def test_retrieve_all_info(self):
+        safe_bulk_reader = SafeBulkReader(self.ethereum_client, batch_size=4)
+        self.assertEqual(safe_bulk_reader.retrieve_all_info([]), [])
+
+        safe_address = self.deploy_test_safe().safe_address
+        safe_address_2 = self.deploy_test_safe().safe_address
+        not_safe_address = Account.create().address
+        addresses = [safe_address, not_safe_address, safe_address_2]
+        safe_info = Safe(safe_address, self.ethereum_client).retrieve_all_info()
+        safe_info_2 = Safe(safe_address_2, self.ethereum_client).retrieve_all_info()
+        with mock.patch.object(SafeBulkReader, 'safes_per_chunk', 2):
+            results = safe_bulk_reader.retrieve_all_info(addresses)
+            self.assertEqual(results[0], safe_info)
+            self.assertIsInstance(results[1], CannotRetrieveSafeInfo)
+            self.assertEqual(results[1].args[0], not_safe_address)
+            self.assertEqual(results[2], safe_info_2)
+
+            # If a batch fails, Safes of the chunk are retried one by one and only failing Safes are reported
+            iter_raw_batch_request = self.ethereum_client.iter_raw_batch_request
+            payloads = []
+
+            def fail_for_not_safe_address(payload, batch_size=None):
+                payloads.append(payload)
+                if any(query['params'][0] == not_safe_address for query in payload):
+                    raise BatchRequestException()
+                return iter_raw_batch_request(payload, batch_size=batch_size)
+
+            with mock.patch.object(self.ethereum_client, 'iter_raw_batch_request',
+                                   side_effect=fail_for_not_safe_address):
+                results = safe_bulk_reader.retrieve_all_info(addresses, block_identifier=safe_info.block_number)
+            self.assertEqual(len(payloads), 4)  # Failed chunk, retry for every Safe of the chunk and next chunk
+            self.assertEqual(results[0], safe_info)
+            self.assertIsInstance(results[1], CannotRetrieveSafeInfo)
+            self.assertEqual(results[1].args[0], not_safe_address)
+            self.assertIsInstance(results[1].__cause__, BatchRequestException)
+            self.assertEqual(results[2], safe_info_2)
+
+    def test_retrieve_all_info_state_cache(self):
+        safe_address = self.deploy_test_safe().safe_address
+        safe_state_cache = SafeStateCache(self.ethereum_client, head_ttl=3600)
+        safe_bulk_reader = SafeBulkReader(self.ethereum_client, state_cache=safe_state_cache)
+        safe = Safe(safe_address, self.ethereum_client, state_cache=safe_state_cache)
+        block_number = safe.resolve_block_number('latest')
+
+        # `latest` is pinned to the head of the shared cache, as for `Safe`
+        self.send_ether(Account.create().address, 1)
+        self.assertGreater(self.ethereum_client.current_block_number, block_number)
+        self.assertEqual(safe_bulk_reader.retrieve_all_info([safe_address]), [safe.retrieve_all_info()])
+        self.assertEqual(safe.retrieve_all_info().block_number, block_number)
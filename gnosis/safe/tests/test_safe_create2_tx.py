@@ -1,10 +1,16 @@
 import logging
+from unittest import mock
 
 from django.test import TestCase
 
+from eth_abi.packed import encode_abi_packed
 from eth_account import Account
+from web3 import Web3
 
+from gnosis.eth.cache import LRUCache
+from gnosis.eth.constants import NULL_ADDRESS
 from gnosis.eth.contracts import get_safe_contract, get_safe_V1_0_0_contract
+from gnosis.eth.utils import generate_address_2
 
 from ..safe_create2_tx import SafeCreate2TxBuilder
 from .safe_test_case import SafeTestCaseMixin
@@ -318,3 +324,46 @@ class TestSafeCreationTx(SafeTestCaseMixin, TestCase):
                         tx_receipt.gasUsed,
                         safe_creation_tx.gas - tx_receipt.gasUsed,
                         tx_receipt.gasUsed // len(owners))
+
+    def test_calculate_create2_address_cache(self):
+        w3 = self.w3
+        contract_cache = LRUCache()
+        safe_setup_data = b'\x12\x34'
+        salt_nonce = generate_salt_nonce()
+        builder = SafeCreate2TxBuilder(w3=w3,
+                                       master_copy_address=self.safe_contract_address,
+                                       proxy_factory_address=self.proxy_factory_contract_address,
+                                       contract_cache=contract_cache)
+        safe_address = builder.calculate_create2_address(safe_setup_data, salt_nonce)
+
+        proxy_creation_code = self.proxy_factory_contract.functions.proxyCreationCode().call()
+        salt = Web3.keccak(encode_abi_packed(['bytes', 'bytes'],
+                                             [Web3.keccak(safe_setup_data),
+                                              Web3.keccak(encode_abi_packed(['uint256', 'address'],
+                                                                            [salt_nonce, NULL_ADDRESS]))]))
+        deployment_data = encode_abi_packed(['bytes', 'uint256'], [proxy_creation_code,
+                                                                   int(self.safe_contract_address, 16)])
+        self.assertEqual(safe_address, generate_address_2(self.proxy_factory_contract_address, salt,
+                                                          deployment_data))
+
+        # Version and proxy creation code are cached, no calls to the node are needed anymore
+        with mock.patch.object(w3.eth, 'call', side_effect=ValueError('Node should not be called')):
+            cached_builder = SafeCreate2TxBuilder(w3=w3,
+                                                  master_copy_address=self.safe_contract_address,
+                                                  proxy_factory_address=self.proxy_factory_contract_address,
+                                                  contract_cache=contract_cache)
+            self.assertEqual(cached_builder.safe_version, builder.safe_version)
+            self.assertEqual(cached_builder.calculate_create2_address(safe_setup_data, salt_nonce), safe_address)
+            self.assertNotEqual(cached_builder.calculate_create2_address(safe_setup_data, salt_nonce + 1),
+                                safe_address)
+
+            # Cached data is not used for other networks
+            with mock.patch.object(SafeCreate2TxBuilder, '_network_ids', {w3: builder.network_id + 1}):
+                with self.assertRaisesMessage(ValueError, 'Node should not be called'):
+                    SafeCreate2TxBuilder(w3=w3,
+                                         master_copy_address=self.safe_contract_address,
+                                         proxy_factory_address=self.proxy_factory_contract_address,
+                                         contract_cache=contract_cache)
+        self.assertEqual(builder.network_id, int(w3.net.version))
+        self.assertEqual(contract_cache.get(f'safe_version:{builder.network_id}:{self.safe_contract_address}'),
+                         builder.safe_version)
@@ -6,7 +6,7 @@ from eth_account import Account
 from ethereum.utils import ecrecover_to_pub
 
 from gnosis.eth.constants import NULL_ADDRESS
-from gnosis.eth.contracts import get_safe_contract
+from gnosis.eth.contracts import encode_contract_function, get_safe_contract
 from gnosis.eth.utils import get_eth_address_with_key
 
 from ..safe_creation_tx import SafeCreationTx
@@ -359,3 +359,13 @@ class TestSafeCreationTx(SafeTestCaseMixin, TestCase):
                         safe_creation_tx.gas,
                         tx_receipt.gasUsed,
                         safe_creation_tx.gas - tx_receipt.gasUsed)
+
+    def test_safe_creation_tx_calculate_gas(self):
+        # Gas and payment must not change depending on how setup data is encoded, they are part of the signed tx
+        owners = ['0x%040x' % i for i in range(1, 3)]
+        safe_setup_data = encode_contract_function('safe_V0_0_1', 'setup', [owners, 1, NULL_ADDRESS, b''])
+        self.assertEqual(len(safe_setup_data), 260)
+        gas = SafeCreationTx._calculate_gas(owners, safe_setup_data, NULL_ADDRESS)
+        self.assertEqual(gas, 374972)
+        self.assertEqual(SafeCreationTx._calculate_gas(owners, safe_setup_data.hex(), NULL_ADDRESS), gas)
+        self.assertEqual(SafeCreationTx._calculate_refund_payment(gas, 1, None, 1.0), 397972)
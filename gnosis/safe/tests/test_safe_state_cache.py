@@ -0,0 +1,144 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from eth_account import Account
+from web3 import Web3
+
+from ..safe import Safe
+from ..safe_state_cache import SafeStateCache
+from .safe_test_case import SafeTestCaseMixin
+
+
+class TestSafeStateCache(SafeTestCaseMixin, TestCase):
+    def test_safe_state_cache(self):
+        safe_creation = self.deploy_test_safe()
+        safe_state_cache = SafeStateCache(self.ethereum_client, head_ttl=3600)
+        safe = Safe(safe_creation.safe_address, self.ethereum_client, state_cache=safe_state_cache)
+        self.assertEqual(len(safe_state_cache), 0)  # An empty cache must be used too
+        with mock.patch.object(safe, 'get_contract', wraps=safe.get_contract) as get_contract_mock:
+            self.assertEqual(safe.retrieve_threshold(), safe_creation.threshold)
+            self.assertEqual(len(safe_state_cache), 1)
+            self.assertEqual(safe.retrieve_threshold(), safe_creation.threshold)
+            self.assertEqual(get_contract_mock.call_count, 1)
+            self.assertEqual(safe.retrieve_owners(), safe_creation.owners)
+            self.assertEqual(safe.retrieve_owners(), safe_creation.owners)
+            self.assertEqual(get_contract_mock.call_count, 2)
+            self.assertEqual(len(safe_state_cache), 2)
+
+            # Pinned block is resolved to the same block than `latest`
+            block_number = self.ethereum_client.current_block_number
+            self.assertEqual(safe.retrieve_threshold(block_identifier=block_number), safe_creation.threshold)
+            self.assertEqual(get_contract_mock.call_count, 2)
+
+            # Other block tags are not cached
+            safe.retrieve_threshold(block_identifier='pending')
+            self.assertEqual(get_contract_mock.call_count, 3)
+
+            # New head, `latest` is fetched again
+            self.send_ether(Account.create().address, 1)
+            safe_state_cache.update_head()
+            self.assertEqual(safe.retrieve_threshold(), safe_creation.threshold)
+            self.assertEqual(get_contract_mock.call_count, 4)
+            self.assertEqual(safe.retrieve_threshold(block_identifier=block_number), safe_creation.threshold)
+            self.assertEqual(get_contract_mock.call_count, 4)
+            self.assertEqual(len(safe_state_cache), 3)
+
+        # Reorg, new head is not a descendant of the cached blocks
+        head = self.w3.eth.getBlock('latest')
+        safe_state_cache.update_head({'number': head['number'], 'hash': b'\x01' * 32,
+                                      'parentHash': b'\x02' * 32})
+        self.assertEqual(len(safe_state_cache), 0)
+
+    def test_safe_state_cache_resolve_block_number(self):
+        safe_creation = self.deploy_test_safe()
+        safe_state_cache = SafeStateCache(self.ethereum_client, head_ttl=3600)
+        safe = Safe(safe_creation.safe_address, self.ethereum_client, state_cache=safe_state_cache)
+        self.assertEqual(len(safe_state_cache), 0)
+        block_number = safe.resolve_block_number('latest')
+        self.assertEqual(block_number, safe_state_cache.get_head_number())
+
+        # `latest` is pinned to the head of the cache, for `retrieve_all_info` too
+        self.send_ether(Account.create().address, 1)
+        self.assertGreater(self.ethereum_client.current_block_number, block_number)
+        self.assertEqual(safe.resolve_block_number('latest'), block_number)
+        self.assertEqual(safe.retrieve_all_info().block_number, block_number)
+
+    def test_safe_state_cache_max_blocks(self):
+        safe_state_cache = SafeStateCache(self.ethereum_client, max_blocks=2)
+        head = self.w3.eth.getBlock('latest')
+        safe_state_cache.update_head(head)
+        fetch_fn = mock.MagicMock(return_value=5)
+        address = Account.create().address
+        self.assertEqual(safe_state_cache.get_or_fetch(address, 'nonce', head['number'], fetch_fn), 5)
+        self.assertEqual(safe_state_cache.get_or_fetch(address, 'nonce', head['number'], fetch_fn), 5)
+        fetch_fn.assert_called_once_with(head['number'])
+
+        # Old blocks are removed
+        for i in range(1, 3):
+            safe_state_cache.update_head({'number': head['number'] + i, 'hash': bytes([i]) * 32,
+                                          'parentHash': head['hash'] if i == 1 else bytes([i - 1]) * 32})
+        self.assertEqual(len(safe_state_cache), 0)
+        # Not cacheable anymore
+        safe_state_cache.get_or_fetch(address, 'nonce', head['number'], fetch_fn)
+        self.assertEqual(fetch_fn.call_count, 2)
+        self.assertEqual(len(safe_state_cache), 0)
+
+    def test_safe_state_cache_reorg_multiple_blocks(self):
+        def build_block(number: int, fork: str, parent_hash: bytes):
+            return {'number': number, 'hash': Web3.keccak(text=fork + str(number)), 'parentHash': parent_hash}
+
+        chain_a = [build_block(100, 'a', b'\x00' * 32)]
+        for number in range(101, 105):
+            chain_a.append(build_block(number, 'a', chain_a[-1]['hash']))
+        chain_b = [chain_a[0]]  # Fork after block 100
+        for number in range(101, 105):
+            chain_b.append(build_block(number, 'b', chain_b[-1]['hash']))
+        blocks_by_hash = {block['hash']: block for block in chain_a + chain_b}
+
+        safe_state_cache = SafeStateCache(self.ethereum_client, head_ttl=3600)
+        fetch_fn = mock.MagicMock(return_value=5)
+        address = Account.create().address
+        with mock.patch.object(self.w3.eth, 'getBlock',
+                               side_effect=lambda block_hash: blocks_by_hash[block_hash]) as get_block_mock:
+            for block in chain_a[:3]:
+                safe_state_cache.update_head(block)
+                safe_state_cache.get_or_fetch(address, 'nonce', block['number'], fetch_fn)
+            self.assertEqual(len(safe_state_cache), 3)
+            get_block_mock.assert_not_called()
+
+            # Head jumps 2 blocks on the same chain, only the missing ancestor is requested
+            safe_state_cache.update_head(chain_a[4])
+            get_block_mock.assert_called_once_with(chain_a[3]['hash'])
+            self.assertEqual(len(safe_state_cache), 3)
+
+            # Head jumps to a fork of the same height, every block after the fork is removed
+            get_block_mock.reset_mock()
+            safe_state_cache.update_head(chain_b[4])
+            self.assertEqual(get_block_mock.call_count, 3)
+            self.assertEqual(len(safe_state_cache), 1)
+            self.assertEqual(safe_state_cache._block_hashes[102], bytes(chain_b[2]['hash']))
+
+            # Pinned blocks use the new canonical chain
+            self.assertEqual(fetch_fn.call_count, 3)
+            safe_state_cache.get_or_fetch(address, 'nonce', 100, fetch_fn)
+            self.assertEqual(fetch_fn.call_count, 3)
+            safe_state_cache.get_or_fetch(address, 'nonce', 102, fetch_fn)
+            self.assertEqual(fetch_fn.call_count, 4)
+            self.assertEqual(len(safe_state_cache), 2)
+
+    def test_safe_state_cache_reorg_jump(self):
+        safe_state_cache = SafeStateCache(self.ethereum_client, head_ttl=3600)
+        head = self.w3.eth.getBlock('latest')
+        safe_state_cache.update_head(head)
+        safe_state_cache.get_or_fetch(Account.create().address, 'nonce', head['number'],
+                                      mock.MagicMock(return_value=5))
+        self.assertEqual(len(safe_state_cache), 1)
+
+        # New head several blocks ahead whose chain doesn't include the cached head
+        orphan_parent = {'number': head['number'] + 2, 'hash': b'\x03' * 32, 'parentHash': b'\x02' * 32}
+        orphan_grandparent = {'number': head['number'] + 1, 'hash': b'\x02' * 32, 'parentHash': b'\x01' * 32}
+        with mock.patch.object(self.w3.eth, 'getBlock', side_effect=[orphan_parent, orphan_grandparent]):
+            safe_state_cache.update_head({'number': head['number'] + 3, 'hash': b'\x04' * 32,
+                                          'parentHash': b'\x03' * 32})
+        self.assertEqual(len(safe_state_cache), 0)
@@ -1,4 +1,5 @@
 import logging
+from unittest import mock
 
 from django.test import TestCase
 
@@ -129,6 +130,41 @@ class TestSafeTx(SafeTestCaseMixin, TestCase):
         self.assertEqual(set(signers), set(safe_tx.signers))
         self.assertEqual(len(safe_tx.signers), 2)
 
+    def test_safe_tx_hash_cache(self):
+        safe_tx = SafeTx(self.ethereum_client, '0x692a70d2e424a56d2c6c27aa97d1a86395877b3a',
+                         '0x5AC255889882aaB35A2aa939679E3F3d4Cea221E',
+                         5000000,
+                         HexBytes('0x00'),
+                         0,
+                         50000,
+                         100,
+                         10000,
+                         '0x' + '0' * 40,
+                         '0x' + '0' * 40)
+        with self.assertRaises(ValueError):
+            safe_tx.safe_tx_hash
+
+        with mock.patch.object(safe_tx, '_calculate_safe_tx_hash',
+                               wraps=safe_tx._calculate_safe_tx_hash) as calculate_safe_tx_hash_mock:
+            safe_tx.safe_nonce = 67
+            expected_hash = HexBytes('0x7c60341f3e1b4483575f38e84e97d6b332a2dd55b9290f39e6e26eef29a04fe7')
+            self.assertEqual(safe_tx.safe_tx_hash, expected_hash)
+            self.assertEqual(safe_tx.safe_tx_hash, expected_hash)
+            safe_tx.sign(Account.create().key)
+            safe_tx.sign(Account.create().key)
+            self.assertEqual(len(safe_tx.signers), 2)
+            self.assertEqual(calculate_safe_tx_hash_mock.call_count, 1)
+
+            # Fields not hashed don't invalidate the hash
+            safe_tx.signatures = b''
+            self.assertEqual(safe_tx.safe_tx_hash, expected_hash)
+            self.assertEqual(calculate_safe_tx_hash_mock.call_count, 1)
+
+            safe_tx.safe_version = '0.1.0'
+            self.assertEqual(safe_tx.safe_tx_hash,
+                             HexBytes('0xc9d69a2350aede7978fdee58e702647e4bbdc82168577aa4a43b66ad815c6d1a'))
+            self.assertEqual(calculate_safe_tx_hash_mock.call_count, 2)
+
     def test_hash_safe_multisig_tx(self):
         # -------- Old version of the contract --------------------------
         expected_hash = HexBytes('0xc9d69a2350aede7978fdee58e702647e4bbdc82168577aa4a43b66ad815c6d1a')
@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from eth_account import Account
+from hexbytes import HexBytes
+
+from .. import safe_signature, signatures
+from ..safe_signature import SafeSignature
+from ..signatures import (SIGNING_ADDRESS_CACHE, get_signing_address,
+                          get_signing_addresses, iter_signatures,
+                          signature_split, signatures_to_bytes)
+
+
+class TestSignatures(TestCase):
+    def setUp(self):
+        SIGNING_ADDRESS_CACHE.clear()
+
+    def _build_signatures(self, number: int):
+        accounts = [Account.create() for _ in range(number)]
+        signed_hash = HexBytes('0x4c9577d1b1b8dec52329a983ae26238b65f74b7dd9fb28d74ad9548e92aaf196')
+        return accounts, [(signed_hash, *signature_split(account.signHash(signed_hash)['signature']))
+                          for account in accounts]
+
+    def test_get_signing_addresses(self):
+        self.assertEqual(get_signing_addresses([]), [])
+        accounts, signatures_to_recover = self._build_signatures(3)
+        expected = [account.address for account in accounts]
+        self.assertEqual([get_signing_address(*signature) for signature in signatures_to_recover], expected)
+
+        with mock.patch.object(signatures, 'get_signing_address',
+                               wraps=get_signing_address) as get_signing_address_mock:
+            self.assertEqual(get_signing_addresses(signatures_to_recover), expected)
+            self.assertEqual(get_signing_address_mock.call_count, 3)
+            # Results are cached
+            self.assertEqual(get_signing_addresses(signatures_to_recover + signatures_to_recover[:1]),
+                             expected + expected[:1])
+            self.assertEqual(get_signing_address_mock.call_count, 3)
+        self.assertEqual(len(SIGNING_ADDRESS_CACHE), 3)
+
+    def test_get_signing_addresses_invalid(self):
+        accounts, signatures_to_recover = self._build_signatures(3)
+
+        def get_signing_address_failing(signed_hash, v, r, s):
+            if r == signatures_to_recover[1][2]:
+                raise ValueError('Invalid signature')
+            return get_signing_address(signed_hash, v, r, s)
+
+        # An invalid signature doesn't make the other ones fail, and it's not cached
+        with mock.patch.object(signatures, 'get_signing_address', side_effect=get_signing_address_failing):
+            self.assertEqual(get_signing_addresses(signatures_to_recover),
+                             [accounts[0].address, None, accounts[2].address])
+        self.assertEqual(len(SIGNING_ADDRESS_CACHE), 2)
+
+        # Other errors are not hidden
+        SIGNING_ADDRESS_CACHE.clear()
+        with mock.patch.object(signatures, 'get_signing_address', side_effect=RuntimeError('Not a signature error')):
+            with self.assertRaisesMessage(RuntimeError, 'Not a signature error'):
+                get_signing_addresses(signatures_to_recover)
+
+        # Error is raised lazily when parsing the signatures
+        signatures_bytes = signatures_to_bytes([signature[1:] for signature in signatures_to_recover])
+        signed_hash = signatures_to_recover[0][0]
+        SIGNING_ADDRESS_CACHE.clear()
+        with mock.patch.object(signatures, 'get_signing_address', side_effect=get_signing_address_failing), \
+                mock.patch.object(safe_signature, 'get_signing_address', side_effect=get_signing_address_failing):
+            safe_signatures = SafeSignature.parse_signatures(signatures_bytes, signed_hash)
+            self.assertEqual(next(safe_signatures).owner, accounts[0].address)
+            with self.assertRaisesMessage(ValueError, 'Invalid signature'):
+                next(safe_signatures)
+
+    def test_iter_signatures(self):
+        vrs = [(27, 1, 2), (28, 2 ** 256 - 1, 2 ** 255), (0, 5, 0)]
+        signatures_bytes = signatures_to_bytes(vrs)
+        expected = [(v, r, s, i * 65) for i, (v, r, s) in enumerate(vrs)]
+        self.assertEqual(list(iter_signatures(signatures_bytes)), expected)
+        self.assertEqual(list(iter_signatures(HexBytes(signatures_bytes).hex())), expected)
+        # Incomplete signatures are ignored
+        self.assertEqual(list(iter_signatures(signatures_bytes + b'\x01' * 64)), expected)
+        self.assertEqual(list(iter_signatures(b'')), [])
+        for i, (v, r, s, _) in enumerate(expected):
+            self.assertEqual(signature_split(signatures_bytes, i), (v, r, s))
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+"""
+Measure import time of gnosis-py modules. Every import is measured on a new Python process, so module caches
+are not reused.
+Usage: python scripts/benchmark_import.py [-n RUNS] [module ...]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ['gnosis.eth.contracts', 'gnosis.eth', 'gnosis.safe']
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+MEASURE_CODE = '''
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+'''
+
+
+def measure_import(module: str) -> float:
+    output = subprocess.check_output([sys.executable, '-c', MEASURE_CODE.format(module=module)], cwd=ROOT_PATH)
+    return float(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--runs', type=int, default=10, help='Number of runs for every module')
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES, help='Modules to import')
+    args = parser.parse_args()
+
+    for module in args.modules:
+        timings = [measure_import(module) for _ in range(args.runs)]
+        print(f'{module}: min={min(timings) * 1000:.1f}ms median={statistics.median(timings) * 1000:.1f}ms '
+              f'runs={args.runs}')
+
+
+if __name__ == '__main__':
+    main()
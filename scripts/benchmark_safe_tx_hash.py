@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""
+Compare `SafeTx.safe_tx_hash` calculated with the precomputed Safe EIP712 encoder against the generic
+`py_eth_sig_utils.encode_typed_data`.
+Usage (from the repository root): PYTHONPATH=. python scripts/benchmark_safe_tx_hash.py [-n TXS]
+"""
+import argparse
+import os
+import time
+
+from eth_account import Account
+from hexbytes import HexBytes
+
+from py_eth_sig_utils.eip712 import encode_typed_data
+
+from gnosis.eth.constants import NULL_ADDRESS
+from gnosis.safe.safe_tx import SafeTx
+
+
+def build_safe_txs(number: int):
+    safe_addresses = [Account.create().address for _ in range(10)]
+    to = Account.create().address
+    return [SafeTx(None, safe_addresses[i % len(safe_addresses)], to, i, HexBytes(os.urandom(68)), 0, 50000,
+                   100, 10000, NULL_ADDRESS, NULL_ADDRESS, safe_nonce=i) for i in range(number)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--txs', type=int, default=10000, help='Number of SafeTx to hash')
+    args = parser.parse_args()
+
+    safe_txs = build_safe_txs(args.txs)
+    start = time.perf_counter()
+    expected_hashes = [HexBytes(encode_typed_data(safe_tx.eip712_structured_data)) for safe_tx in safe_txs]
+    generic_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hashes = SafeTx.hash_many(safe_txs)
+    elapsed = time.perf_counter() - start
+
+    assert hashes == expected_hashes, 'Hashes do not match'
+    print(f'encode_typed_data: {generic_elapsed * 1000:.1f}ms')
+    print(f'SafeTx.hash_many: {elapsed * 1000:.1f}ms ({generic_elapsed / elapsed:.1f}x) txs={args.txs}')
+
+
+if __name__ == '__main__':
+    main()
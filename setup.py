@@ -23,6 +23,9 @@ setup(
     version='2.1.2',
     packages=find_packages(),
     install_requires=requirements,
+    extras_require={
+        'async': ['aiohttp>=3.6'],
+    },
     include_package_data=True,
     license='MIT License',
     description='Gnosis libraries for Python Projects',